@@ -3,9 +3,8 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+# Importing the package loads .env
+import app  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,73 @@
+"""blacklisted token expires_at
+
+Revision ID: 0a7c3e9f5d21
+Revises: f1b6d8e2a953
+Create Date: 2026-10-17 18:03:41.207615
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import jwt
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7c3e9f5d21'
+down_revision: Union[str, Sequence[str], None] = 'f1b6d8e2a953'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blacklisted_tokens', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill from each token's own exp claim; the signature is irrelevant here.
+    # Keyset batches over the primary key keep memory flat, one UPDATE per batch.
+    conn = op.get_bind()
+    select_batch = sa.text(
+        "SELECT token FROM blacklisted_tokens WHERE token > :last_token ORDER BY token LIMIT :batch_size"
+    )
+    update_batch = sa.text(
+        "UPDATE blacklisted_tokens AS b SET expires_at = v.expires_at "
+        "FROM unnest(:tokens, :expires_at) AS v(token, expires_at) WHERE b.token = v.token"
+    ).bindparams(
+        sa.bindparam("tokens", type_=postgresql.ARRAY(sa.String())),
+        sa.bindparam("expires_at", type_=postgresql.ARRAY(sa.DateTime(timezone=True))),
+    )
+
+    last_token = ""
+    while True:
+        tokens = conn.execute(select_batch, {"last_token": last_token, "batch_size": BACKFILL_BATCH_SIZE}).scalars().all()
+        if not tokens:
+            break
+        last_token = tokens[-1]
+
+        batch = {"tokens": [], "expires_at": []}
+        for token in tokens:
+            try:
+                payload = jwt.decode(token, options={"verify_signature": False})
+            except jwt.PyJWTError:
+                continue
+            if "exp" in payload:
+                batch["tokens"].append(token)
+                batch["expires_at"].append(datetime.fromtimestamp(payload["exp"], tz=timezone.utc))
+        if batch["tokens"]:
+            conn.execute(update_batch, batch)
+
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_blacklisted_tokens_expires_at'), 'blacklisted_tokens', ['expires_at'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_blacklisted_tokens_expires_at'), table_name='blacklisted_tokens',
+                      postgresql_concurrently=True)
+    op.drop_column('blacklisted_tokens', 'expires_at')
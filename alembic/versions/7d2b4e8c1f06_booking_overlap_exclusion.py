@@ -0,0 +1,32 @@
+"""booking overlap exclusion constraint
+
+Revision ID: 7d2b4e8c1f06
+Revises: 1c5e0f3a9b21
+Create Date: 2026-10-17 09:40:02.514870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2b4e8c1f06'
+down_revision: Union[str, Sequence[str], None] = '1c5e0f3a9b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist provides the gist operator class for "service_id WITH ="
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT excl_bookings_service_overlap "
+        "EXCLUDE USING gist (service_id WITH =, tstzrange(start_time, end_time) WITH &&) "
+        "WHERE (status IN ('PENDING', 'CONFIRMED'))"
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('excl_bookings_service_overlap', 'bookings', type_='exclude')
@@ -0,0 +1,41 @@
+"""keyset pagination indexes
+
+Revision ID: a43f9c6d2e17
+Revises: 7d2b4e8c1f06
+Create Date: 2026-10-17 11:05:27.301642
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a43f9c6d2e17'
+down_revision: Union[str, Sequence[str], None] = '7d2b4e8c1f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_start_time_id', 'bookings', ['start_time', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_bookings_user_id_start_time_id', 'bookings', ['user_id', 'start_time', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_services_created_at_id', 'services', ['created_at', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_services_is_active_created_at_id', 'services', ['is_active', 'created_at', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_services_is_active_created_at_id', table_name='services', postgresql_concurrently=True)
+        op.drop_index('ix_services_created_at_id', table_name='services', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_user_id_start_time_id', table_name='bookings', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_start_time_id', table_name='bookings', postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""hot query indexes
+
+Revision ID: b58e1d7a4c93
+Revises: a43f9c6d2e17
+Create Date: 2026-10-17 12:21:48.907311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b58e1d7a4c93'
+down_revision: Union[str, Sequence[str], None] = 'a43f9c6d2e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_active_service_id_start_time', 'bookings',
+                        ['service_id', 'start_time', 'end_time'],
+                        postgresql_where=sa.text("status IN ('PENDING', 'CONFIRMED')"),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_reviews_booking_id'), 'reviews', ['booking_id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_reviews_service_id_created_at', 'reviews', ['service_id', 'created_at'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_services_is_active_price', 'services', ['is_active', 'price'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_services_is_active_price', table_name='services', postgresql_concurrently=True)
+        op.drop_index('ix_reviews_service_id_created_at', table_name='reviews', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_reviews_booking_id'), table_name='reviews', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_active_service_id_start_time', table_name='bookings', postgresql_concurrently=True)
@@ -0,0 +1,32 @@
+"""blacklisted token jti
+
+Revision ID: c6a2f0e94b58
+Revises: b58e1d7a4c93
+Create Date: 2026-10-17 14:02:11.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a2f0e94b58'
+down_revision: Union[str, Sequence[str], None] = 'b58e1d7a4c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blacklisted_tokens', sa.Column('jti', sa.String(), nullable=True))
+    op.create_index(op.f('ix_blacklisted_tokens_jti'), 'blacklisted_tokens', ['jti'], unique=False)
+    op.create_index(op.f('ix_blacklisted_tokens_blacklisted_at'), 'blacklisted_tokens', ['blacklisted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_blacklisted_tokens_blacklisted_at'), table_name='blacklisted_tokens')
+    op.drop_index(op.f('ix_blacklisted_tokens_jti'), table_name='blacklisted_tokens')
+    op.drop_column('blacklisted_tokens', 'jti')
@@ -0,0 +1,41 @@
+"""review keyset indexes
+
+Revision ID: e4a9c2d60b17
+Revises: d7e3b1c58a24
+Create Date: 2026-10-17 16:05:33.902144
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c2d60b17'
+down_revision: Union[str, Sequence[str], None] = 'd7e3b1c58a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_reviews_service_id_created_at_id', 'reviews', ['service_id', 'created_at', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_reviews_service_id_rating_created_at_id', 'reviews',
+                        ['service_id', 'rating', 'created_at', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        # Covered by the (service_id, created_at, id) index
+        op.drop_index('ix_reviews_service_id_created_at', table_name='reviews',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_reviews_service_id_created_at', 'reviews', ['service_id', 'created_at'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_reviews_service_id_rating_created_at_id', table_name='reviews',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_reviews_service_id_created_at_id', table_name='reviews', postgresql_concurrently=True)
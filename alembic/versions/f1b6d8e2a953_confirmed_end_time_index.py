@@ -0,0 +1,32 @@
+"""confirmed bookings end_time index
+
+Revision ID: f1b6d8e2a953
+Revises: e4a9c2d60b17
+Create Date: 2026-10-17 17:12:09.554371
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d8e2a953'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c2d60b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_confirmed_end_time', 'bookings', ['end_time'],
+                        postgresql_where=sa.text("status = 'CONFIRMED'"),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_bookings_confirmed_end_time', table_name='bookings', postgresql_concurrently=True)
@@ -1,23 +1,26 @@
 import logging
+from datetime import datetime, timezone
 from uuid import UUID
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import values, except_
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, values, except_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models
 from app.models import User, BlacklistedToken
+from app.revocation import revoked_tokens, revocation_key
 from app.schemas.user import UserCreate, RefreshToken
-from app.security import authenticate_user, create_token, SECRET_KEY, ALGORITHM, create_access_token, create_refresh_token
+from app.security import authenticate_user, create_token, SECRET_KEY, ALGORITHM, create_access_token, create_refresh_token, \
+    token_subject, get_user_by_subject
 
 logger = logging.getLogger(__name__)
 
 class AuthService:
     @staticmethod
-    def login(db: Session, form_data: OAuth2PasswordRequestForm):
+    async def login(db: AsyncSession, form_data: OAuth2PasswordRequestForm):
         logger.info("Authenticating user...")
-        user = authenticate_user(db, email=form_data.username, password=form_data.password)
+        user = await authenticate_user(db, email=form_data.username, password=form_data.password)
         if not user:
             logger.warning("Login failed: Invalid credentials")
             raise HTTPException(
@@ -26,10 +29,10 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token = create_access_token(sub=user.email, roles=[user.role])
-        refresh_token = create_refresh_token({"sub":user.email})
+        access_token = create_access_token(sub=token_subject(user), roles=[user.role])
+        refresh_token = create_refresh_token({"sub":token_subject(user)})
 
-        logger.info(f"Tokens issued for {user.email}")
+        logger.info("Tokens issued for %s", user.email)
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
@@ -37,7 +40,7 @@ class AuthService:
         }
 
     @staticmethod
-    def register(db: Session, user_data: UserCreate, password_hash: str):
+    async def register(db: AsyncSession, user_data: UserCreate, password_hash: str):
 
         user = models.User(
             name=user_data.name,
@@ -46,14 +49,14 @@ class AuthService:
             role="user"
         )
         db.add(user)
-        db.flush()
-        db.refresh(user)
+        await db.flush()
+        await db.refresh(user)
         return user
 
 
 
     @staticmethod
-    def refresh_token(db: Session, refresh_token: str):
+    async def refresh_token(db: AsyncSession, refresh_token: str):
         try:
             payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
 
@@ -64,13 +67,19 @@ class AuthService:
                     detail="Invalid token type"
                 )
 
-            user_email = payload.get("sub")
-            if user_email is None:
+            user_sub = payload.get("sub")
+            if user_sub is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token"
                 )
 
+            if revoked_tokens.is_revoked(revocation_key(refresh_token, payload)):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked"
+                )
+
         except jwt.ExpiredSignatureError:
             logger.error("Refresh token expired")
             raise HTTPException(
@@ -78,23 +87,23 @@ class AuthService:
                 detail="Refresh token expired"
             )
         except jwt.PyJWTError as e:
-            logger.error(f"Invalid refresh token: {str(e)}")
+            logger.error("Invalid refresh token: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
             )
 
         # Check if user exists
-        user = db.query(User).filter(User.email == user_email).first()
+        user = await get_user_by_subject(db, user_sub)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
 
-        new_access_token = create_access_token(sub=user.email, roles=[user.role])
-        new_refresh_token = create_refresh_token({"sub":user.email})
-        logger.info(f"Tokens refreshed for {user.email}")
+        new_access_token = create_access_token(sub=token_subject(user), roles=[user.role])
+        new_refresh_token = create_refresh_token({"sub":token_subject(user)})
+        logger.info("Tokens refreshed for %s", user.email)
         return {
             "access_token": new_access_token,
             "refresh_token": new_refresh_token,
@@ -102,24 +111,51 @@ class AuthService:
         }
 
     @staticmethod
-    def logout(db: Session, token: str):
+    async def logout(db: AsyncSession, token: str):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+        except jwt.PyJWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+
         try:
-            existing = db.query(BlacklistedToken).filter(BlacklistedToken.token == token).first()
-            if existing:
+            key = revocation_key(token, payload)
+            if revoked_tokens.is_revoked(key):
                 return {"message": "Token already blacklisted"}
 
-            blacklisted_token = BlacklistedToken(token=token)
-            db.add(blacklisted_token)
-            db.commit()
-            db.refresh(blacklisted_token)
+            existing = await db.scalar(select(BlacklistedToken).where(BlacklistedToken.token == token))
+            if not existing:
+                expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc) if "exp" in payload else None
+                blacklisted_token = BlacklistedToken(token=token, jti=payload.get("jti"), expires_at=expires_at)
+                db.add(blacklisted_token)
+                await db.commit()
 
+            revoked_tokens.add(key, float(payload.get("exp", 0)))
             return {"message": "Successfully logged out"}
 
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error during logout: {str(e)}"
             )
+    @staticmethod
+    async def purge_expired_tokens(db: AsyncSession, batch_size: int) -> int:
+        # Small batches keep each delete short; SKIP LOCKED lets instances sweep side by side
+        expired = (
+            select(BlacklistedToken.token)
+            .where(BlacklistedToken.expires_at < func.now())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            delete(BlacklistedToken)
+            .where(BlacklistedToken.token.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
 
 Auth_Service = AuthService()
\ No newline at end of file
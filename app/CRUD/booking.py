@@ -1,16 +1,39 @@
 from datetime import datetime, timezone, timedelta
 import logging
+import os
 from fastapi import HTTPException, status
 from typing import Optional, List
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import any_, bindparam, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models
-from app.models import Booking, User
+from app.CRUD.rating import Rating_Crud
+from app.database import read_connection
+from app.models import Booking, Review, User
+from app.pagination import encode_cursor, decode_cursor
 from app.schemas.booking import BookingStatus
 from app.schemas.user import Role
 
 logger = logging.getLogger(__name__)
 
+# Postgres SQLSTATE codes raised by the bookings constraints
+EXCLUSION_VIOLATION = "23P01"
+FOREIGN_KEY_VIOLATION = "23503"
+
+# Statuses an admin batch may move a booking into, and the statuses it may leave.
+# Going back to PENDING is left to update_booking since it can collide with other bookings.
+BATCH_STATUS_TRANSITIONS = {
+    BookingStatus.CONFIRMED: [BookingStatus.PENDING],
+    BookingStatus.COMPLETED: [BookingStatus.CONFIRMED],
+    BookingStatus.CANCELLED: [BookingStatus.PENDING, BookingStatus.CONFIRMED],
+}
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 2000))
+EXPORT_COLUMNS = (Booking.id, Booking.user_id, Booking.service_id, Booking.start_time,
+                  Booking.end_time, Booking.status, Booking.created_at)
+
 class Booking_Crud:
 
     @staticmethod
@@ -20,93 +43,134 @@ class Booking_Crud:
         return dt
 
     @staticmethod
-    def create_booking(db: Session, booking_data, user_id: UUID) -> Booking:
+    async def create_booking(db: AsyncSession, booking_data, user_id: UUID) -> Booking:
         now = datetime.now(timezone.utc)
-        logger.info(f"Creating booking for user {user_id} at {now.isoformat()}")
+        logger.info("Creating booking for user %s at %s", user_id, now)
 
         start_time = Booking_Crud.ensure_timezone_aware(booking_data.start_time)
+        end_time = Booking_Crud.ensure_timezone_aware(booking_data.end_time)
 
         if start_time <= now:
             raise ValueError("Start time must be in the future")
+        if end_time <= start_time:
+            raise ValueError("End time must be after start time")
 
-        overlapping = db.query(Booking).filter(
-            Booking.service_id == booking_data.service_id,
-            Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-            (Booking.start_time <= start_time) & (Booking.end_time > start_time)
-        ).first()
-
-        if overlapping:
-            raise HTTPException(
-                status_code = status.HTTP_409_CONFLICT,
-                detail="Time slot is already booked")
-        
-        logger.info("No overlapping bookings found")
-
-        service = db.query(models.Service).filter(models.Service.id == booking_data.service_id).first()
-        if not service:
-            raise ValueError("Service not found")
-
-
-        booking = Booking(
+        # Overlaps are rejected by the excl_bookings_service_overlap constraint,
+        # so the whole create path is a single INSERT ... RETURNING.
+        stmt = insert(Booking).values(
             user_id=user_id,
             service_id=booking_data.service_id,
             start_time=start_time,
-            end_time=booking_data.end_time,
+            end_time=end_time,
             status=BookingStatus.PENDING
-        )
-        logger.info(f"Booking created: {booking}")
+        ).returning(Booking)
 
-        db.add(booking)
-        db.commit()
-        db.refresh(booking)
+        try:
+            result = await db.execute(stmt)
+            booking = result.scalar_one()
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            sqlstate = getattr(e.orig, "sqlstate", None)
+            if sqlstate == EXCLUSION_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Time slot is already booked")
+            if sqlstate == FOREIGN_KEY_VIOLATION:
+                raise ValueError("Service not found")
+            raise
+
+        logger.info("Booking created: %s", booking.id)
         return booking
 
     @staticmethod
-    def get_bookings(
-            db: Session,
+    async def get_bookings(
+            db: AsyncSession,
             user: User,
             status: Optional[BookingStatus] = None,
             from_date: Optional[datetime] = None,
             to_date: Optional[datetime] = None,
             skip: int = 0,
-            limit: int = 100
+            limit: int = 100,
+            cursor: Optional[str] = None
     ):
-        logger.info(f"Fetching bookings for user {user.id} ")
+        logger.info("Fetching bookings for user %s", user.id)
 
-        query = db.query(Booking)
+        query = select(Booking)
 
         # Regular users can only see their own bookings
         if user.role != Role.ADMIN:
-            query = query.filter(Booking.user_id == user.id)
+            query = query.where(Booking.user_id == user.id)
 
         if status:
-            query = query.filter(Booking.status == status)
+            query = query.where(Booking.status == status)
 
         if from_date:
-            query = query.filter(Booking.start_time >= from_date)
+            query = query.where(Booking.start_time >= from_date)
 
         if to_date:
-            query = query.filter(Booking.start_time <= to_date)
+            query = query.where(Booking.start_time <= to_date)
             
-            logger.info(f"Filtering bookings up to {to_date.isoformat()}")
+            logger.info("Filtering bookings up to %s", to_date)
+
+        query = query.order_by(Booking.start_time.desc(), Booking.id.desc())
 
-        total = query.count()
-        bookings = query.order_by(Booking.start_time.desc()).offset(skip).limit(limit).all()
+        if cursor:
+            # Keyset page: seek past the last row seen, no offset and no count
+            last_start, last_id = decode_cursor(cursor)
+            query = query.where(tuple_(Booking.start_time, Booking.id) < tuple_(last_start, last_id))
+            total = None
+        else:
+            total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+            query = query.offset(skip)
+
+        result = await db.scalars(query.limit(limit + 1))
+        bookings = result.all()
+
+        next_cursor = None
+        if len(bookings) > limit:
+            bookings = bookings[:limit]
+            next_cursor = encode_cursor(bookings[-1].start_time, bookings[-1].id)
+
+        return bookings, total, next_cursor
+
+    @staticmethod
+    def export_query(
+            status: Optional[BookingStatus] = None,
+            from_date: Optional[datetime] = None,
+            to_date: Optional[datetime] = None
+    ):
+        query = select(*EXPORT_COLUMNS)
+        if status:
+            query = query.where(Booking.status == status)
+        if from_date:
+            query = query.where(Booking.start_time >= from_date)
+        if to_date:
+            query = query.where(Booking.start_time <= to_date)
+        return query.order_by(Booking.start_time, Booking.id)
 
-        return bookings, total
+    @staticmethod
+    async def stream_export(query):
+        # One read-only REPEATABLE READ snapshot read through a server-side cursor, so the
+        # export is consistent end to end and only EXPORT_BATCH_SIZE rows are held at a time
+        async with read_connection(isolation_level="REPEATABLE READ", postgresql_readonly=True) as conn:
+            async with conn.begin():
+                result = await conn.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+                async for rows in result.partitions():
+                    yield rows
 
     @staticmethod
-    def get_booking(db: Session, booking_id: UUID, user: User) -> Optional[Booking]:
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    async def get_booking(db: AsyncSession, booking_id: UUID, user: User) -> Optional[Booking]:
+        booking = await db.scalar(select(Booking).where(Booking.id == booking_id))
 
         if booking and (user.role == Role.ADMIN or booking.user_id == user.id):
             return booking
         return None
 
     @staticmethod
-    def update_booking(db: Session, booking_id: UUID, update_data, user: User) -> Optional[Booking]:
-        logger.info(f"Updating booking {booking_id} for user {user.id}")
-        booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    async def update_booking(db: AsyncSession, booking_id: UUID, update_data, user: User) -> Optional[Booking]:
+        logger.info("Updating booking %s for user %s", booking_id, user.id)
+        booking = await db.scalar(select(models.Booking).where(models.Booking.id == booking_id))
         if not booking:
             return None
 
@@ -149,80 +213,143 @@ class Booking_Crud:
             if new_start_time.weekday() >= 5:
                 raise ValueError("Weekend bookings not available")
 
-            overlapping = db.query(Booking).filter(
-                Booking.service_id == booking.service_id,
-                Booking.id != booking_id,
-                Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-                (Booking.start_time <= new_start_time) & (Booking.end_time > new_start_time)
-            ).first()
-
-            if overlapping:
-                raise ValueError("New time slot is already booked")
-
-            service = db.query(models.Service).filter(models.Service.id == booking.service_id).first()
+            service = await db.scalar(select(models.Service).where(models.Service.id == booking.service_id))
             booking.start_time = new_start_time
             booking.end_time = new_start_time + timedelta(minutes=service.duration_minutes)
 
         booking.updated_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(booking)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if getattr(e.orig, "sqlstate", None) == EXCLUSION_VIOLATION:
+                raise ValueError("New time slot is already booked")
+            raise
         return booking
 
 
     @staticmethod
-    def complete_booking(db: Session, booking_id: UUID, admin_user: User) -> Optional[Booking]:
-        logger.info(f"Admin {admin_user.id} completing booking {booking_id}")
+    async def complete_booking(db: AsyncSession, booking_id: UUID, admin_user: User) -> Optional[Booking]:
+        logger.info("Admin %s completing booking %s", admin_user.id, booking_id)
         if admin_user.role != Role.ADMIN:
             raise PermissionError("Only admins can complete bookings")
 
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
+        booking = await db.scalar(select(Booking).where(Booking.id == booking_id))
         if not booking:
-            logger.warning(f"Booking {booking_id} not found")
+            logger.warning("Booking %s not found", booking_id)
             return None
 
     
         booking.status = BookingStatus.COMPLETED
         booking.updated_at = datetime.now(timezone.utc)
 
-        db.commit()
-        db.refresh(booking)
-        logger.info(f"Booking {booking_id} marked as completed")
+        await db.commit()
+        await db.refresh(booking)
+        logger.info("Booking %s marked as completed", booking_id)
         return booking
 
     @staticmethod
-    def delete_booking(db: Session, booking_id: UUID, user: User) -> bool:
+    async def batch_update_status(db: AsyncSession, booking_ids: List[UUID], new_status: BookingStatus, admin_user: User):
+        logger.info("Admin %s moving %s bookings to %s", admin_user.id, len(booking_ids), new_status.name)
+        if admin_user.role != Role.ADMIN:
+            raise PermissionError("Only admins can change bookings in batch")
+
+        sources = BATCH_STATUS_TRANSITIONS.get(new_status)
+        if not sources:
+            raise ValueError(f"Bookings cannot be moved to {new_status.value} in batch")
+
+        booking_ids = list(dict.fromkeys(booking_ids))
+        ids = bindparam("ids", booking_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+
+        result = await db.execute(
+            update(Booking)
+            .where(Booking.id == any_(ids), Booking.status.in_(sources))
+            .values(status=new_status)
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set(result.scalars().all())
+        await db.commit()
+
+        skipped = []
+        missed = [booking_id for booking_id in booking_ids if booking_id not in updated]
+        if missed:
+            # Only reached when something was skipped, to tell missing ids from wrong-status ones
+            result = await db.execute(select(Booking.id, Booking.status).where(
+                Booking.id == any_(bindparam("ids", missed, type_=ARRAY(PG_UUID(as_uuid=True))))
+            ))
+            current = dict(result.all())
+            for booking_id in missed:
+                if booking_id not in current:
+                    reason = "Booking not found"
+                else:
+                    reason = f"Cannot move a {current[booking_id].value} booking to {new_status.value}"
+                skipped.append({"id": booking_id, "reason": reason})
+
+        logger.info("Batch status update: %s updated, %s skipped", len(updated), len(skipped))
+        return [booking_id for booking_id in booking_ids if booking_id in updated], skipped
+
+    @staticmethod
+    async def complete_past_bookings(db: AsyncSession, batch_size: int) -> int:
+        # SKIP LOCKED lets several app instances work through the backlog without waiting on
+        # each other; the literal status matches the ix_bookings_confirmed_end_time predicate
+        due = (
+            select(Booking.id)
+            .where(text("bookings.status = 'CONFIRMED'"), Booking.end_time < func.now())
+            .order_by(Booking.end_time)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        result = await db.execute(
+            update(Booking)
+            .where(Booking.id.in_(select(due.c.id)))
+            .values(status=BookingStatus.COMPLETED)
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        )
+        completed = len(result.all())
+        await db.commit()
+        return completed
+
+    @staticmethod
+    async def delete_booking(db: AsyncSession, booking_id: UUID, user: User) -> bool:
         try:
-            logger.info(f"Deleting booking {booking_id} for user {user.id}")
+            logger.info("Deleting booking %s for user %s", booking_id, user.id)
 
-            booking = db.query(Booking).filter(Booking.id == booking_id).first()
+            booking = await db.scalar(select(Booking).where(Booking.id == booking_id))
             if not booking:
-                logger.warning(f"Booking {booking_id} not found")
+                logger.warning("Booking %s not found", booking_id)
                 return False
 
             now = datetime.now(timezone.utc)
-            logger.info(f"Current time: {now}, Booking start time: {booking.start_time}")
+            logger.debug("Current time: %s, Booking start time: %s", now, booking.start_time)
 
             booking_start = Booking_Crud.ensure_timezone_aware(booking.start_time)
-            logger.info(f"Timezone-aware booking start: {booking_start}")
+            logger.debug("Timezone-aware booking start: %s", booking_start)
 
             if user.role == Role.ADMIN:
-                logger.info("Admin deletion - no time restrictions")
+                logger.debug("Admin deletion - no time restrictions")
             elif booking.user_id == user.id:
                 # User can only delete before start time
                 if booking_start <= now:
-                    logger.warning(f"Cannot delete - booking started at {booking_start}, current time {now}")
+                    logger.warning("Cannot delete - booking started at %s, current time %s", booking_start, now)
                     raise ValueError("Cannot delete booking after it has started")
-                logger.info("User deletion allowed - booking hasn't started yet")
+                logger.debug("User deletion allowed - booking hasn't started yet")
             else:
-                logger.warning(f"User {user.id} not authorized to delete booking {booking_id}")
+                logger.warning("User %s not authorized to delete booking %s", user.id, booking_id)
                 raise PermissionError("Not authorized to delete this booking")
 
-            db.delete(booking)
-            db.commit()
-            logger.info(f"Booking {booking_id} deleted successfully")
+            # The booking's review goes with it, so take its rating out of the service stats
+            review = await db.scalar(select(Review).where(Review.booking_id == booking.id))
+            await db.delete(booking)
+            if review:
+                await Rating_Crud.record_rating(db, review.service_id, removed=review.rating)
+            await db.commit()
+            logger.info("Booking %s deleted successfully", booking_id)
             return True
 
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error deleting booking: {str(e)}")
+            await db.rollback()
+            logger.error("Error deleting booking: %s", e)
             raise
\ No newline at end of file
@@ -0,0 +1,86 @@
+import logging
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Review, ServiceRatingStats
+
+logger = logging.getLogger(__name__)
+
+STATS_COLUMNS = ["service_id", "review_count", "rating_sum",
+                 "rating_1", "rating_2", "rating_3", "rating_4", "rating_5"]
+
+
+def rating_source():
+    # Stats rows computed from the reviews table, in STATS_COLUMNS order
+    return select(
+        Review.service_id,
+        func.count(),
+        func.sum(Review.rating),
+        *[func.count().filter(Review.rating == rating) for rating in range(1, 6)]
+    ).group_by(Review.service_id)
+
+
+class Rating_Crud:
+
+    @staticmethod
+    async def record_rating(db: AsyncSession, service_id: UUID,
+                            added: Optional[int] = None, removed: Optional[int] = None):
+        # Runs inside the caller's transaction so the aggregate commits or rolls back with the review
+        stats = ServiceRatingStats.__table__.c
+        deltas = {"review_count": 0, "rating_sum": 0}
+        if added is not None:
+            deltas["review_count"] += 1
+            deltas["rating_sum"] += added
+            deltas[f"rating_{added}"] = deltas.get(f"rating_{added}", 0) + 1
+        if removed is not None:
+            deltas["review_count"] -= 1
+            deltas["rating_sum"] -= removed
+            deltas[f"rating_{removed}"] = deltas.get(f"rating_{removed}", 0) - 1
+
+        increments = {column: stats[column] + delta for column, delta in deltas.items() if delta}
+        if not increments:
+            return
+        increments["updated_at"] = func.now()
+
+        result = await db.execute(
+            update(ServiceRatingStats)
+            .where(ServiceRatingStats.service_id == service_id)
+            .values(**increments)
+        )
+        if result.rowcount == 1:
+            return
+
+        # No stats row yet (first review, or a service from before the backfill): count the
+        # service's reviews, including this change, instead of starting from the delta
+        await db.flush()
+        await db.execute(
+            insert(ServiceRatingStats)
+            .from_select(STATS_COLUMNS, rating_source().where(Review.service_id == service_id))
+            .on_conflict_do_update(index_elements=[stats.service_id], set_=increments)
+        )
+
+    @staticmethod
+    async def get_rating(db: AsyncSession, service_id: UUID) -> Optional[ServiceRatingStats]:
+        return await db.get(ServiceRatingStats, service_id)
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, service_id: Optional[UUID] = None) -> int:
+        # Block review writes for the duration so no upsert lands between the delete and the insert
+        await db.execute(text("LOCK TABLE reviews IN SHARE MODE"))
+
+        clear = delete(ServiceRatingStats)
+        source = rating_source()
+        if service_id is not None:
+            clear = clear.where(ServiceRatingStats.service_id == service_id)
+            source = source.where(Review.service_id == service_id)
+
+        await db.execute(clear)
+        result = await db.execute(
+            insert(ServiceRatingStats).from_select(STATS_COLUMNS, source)
+        )
+        await db.commit()
+
+        logger.info("Rebuilt rating stats for %s services", result.rowcount)
+        return result.rowcount
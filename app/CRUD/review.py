@@ -1,10 +1,14 @@
 from fastapi import  HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from datetime import datetime, timezone
 from typing import List, Optional
 import logging
 from app import models
+from app.CRUD.rating import Rating_Crud
+from app.database import read_session
+from app.pagination import encode_cursor, decode_cursor, encode_ranked_cursor, decode_ranked_cursor
 from app.models import Review, User
 from app.schemas.booking import BookingStatus
 from app.schemas.review import ReviewUpdate
@@ -12,32 +16,34 @@ from app.schemas.user import Role
 
 logger = logging.getLogger(__name__)
 
+REVIEW_STREAM_BATCH_SIZE = 500
+
 
 class Review_Crud:
 
     @staticmethod
-    def create_review(db: Session, review_data, user_id: UUID) -> Review:
+    async def create_review(db: AsyncSession, review_data, user_id: UUID) -> Review:
         try:
-            logger.info(f"Attempting to create review for booking {review_data.booking_id} by user {user_id}")
+            logger.info("Attempting to create review for booking %s by user %s", review_data.booking_id, user_id)
 
             # Check if booking exists and belongs to user
-            booking = db.query(models.Booking).filter(
+            booking = await db.scalar(select(models.Booking).where(
                 models.Booking.id == review_data.booking_id,
                 models.Booking.user_id == user_id
-            ).first()
+            ))
 
             if not booking:
-                logger.warning(f"Booking {review_data.booking_id} not found or doesn't belong to user {user_id}")
+                logger.warning("Booking %s not found or doesn't belong to user %s", review_data.booking_id, user_id)
                 raise ValueError("Booking not found or access denied")
 
             if booking.status != BookingStatus.COMPLETED:
-                logger.warning(f"Booking {review_data.booking_id} is not completed (status: {booking.status})")
+                logger.warning("Booking %s is not completed (status: %s)", review_data.booking_id, booking.status)
                 raise ValueError("Can only review completed bookings")
 
             # Check if review already exists for this booking
-            existing_review = db.query(Review).filter(Review.booking_id == review_data.booking_id).first()
+            existing_review = await db.scalar(select(Review).where(Review.booking_id == review_data.booking_id))
             if existing_review:
-                logger.warning(f"Review already exists for booking {review_data.booking_id}")
+                logger.warning("Review already exists for booking %s", review_data.booking_id)
                 raise ValueError("Only one review allowed per booking")
 
             review = Review(
@@ -49,35 +55,38 @@ class Review_Crud:
             )
 
             db.add(review)
-            db.commit()
-            db.refresh(review)
+            await Rating_Crud.record_rating(db, booking.service_id, added=review_data.rating)
+            await db.commit()
+            await db.refresh(review)
 
-            logger.info(f"Review {review.id} created successfully for booking {review_data.booking_id}")
+            logger.info("Review %s created successfully for booking %s", review.id, review_data.booking_id)
             return review
 
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error creating review: {str(e)}")
+            await db.rollback()
+            logger.error("Error creating review: %s", e)
             raise
 
     @staticmethod
-    def get_all_reviews(db: Session, skip: int = 0, limit: int = 100) -> List[Review]:
+    async def get_all_reviews(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Review]:
         try:
-            logger.info(f"Fetching all reviews" )
+            logger.info("Fetching all reviews")
 
-            reviews = db.query(models.Review)
+            reviews = await db.scalars(
+                select(models.Review).order_by(models.Review.created_at.desc()).offset(skip).limit(limit)
+            )
 
-            return reviews
+            return reviews.all()
 
         except Exception as e:
-            logger.error(f"Error fetching all reviews: {str(e)}")
+            logger.error("Error fetching all reviews: %s", e)
             raise
 
     @staticmethod
-    def get_service_review(db: Session, service_id: UUID):
+    async def get_service_review(db: AsyncSession, service_id: UUID):
             try:
-                logger.info(f"Checking review for service: {service_id}")
-                query = db.query(Review).filter(Review.service_id == service_id).first()
+                logger.info("Checking review for service: %s", service_id)
+                query = await db.scalar(select(Review).where(Review.service_id == service_id))
 
                 if not query:
                     raise HTTPException(
@@ -90,69 +99,118 @@ class Review_Crud:
                 raise
 
     @staticmethod
-    def get_review(db: Session, review_id: UUID) -> Optional[Review]:
+    def service_reviews_query(service_id: UUID, sort: str = "newest", cursor: Optional[str] = None):
+        query = select(Review).where(Review.service_id == service_id)
+
+        if sort == "rating":
+            query = query.order_by(Review.rating.desc(), Review.created_at.desc(), Review.id.desc())
+            if cursor:
+                last_rating, last_created_at, last_id = decode_ranked_cursor(cursor)
+                query = query.where(
+                    tuple_(Review.rating, Review.created_at, Review.id) < tuple_(last_rating, last_created_at, last_id)
+                )
+        else:
+            query = query.order_by(Review.created_at.desc(), Review.id.desc())
+            if cursor:
+                last_created_at, last_id = decode_cursor(cursor)
+                query = query.where(tuple_(Review.created_at, Review.id) < tuple_(last_created_at, last_id))
+
+        return query
+
+    @staticmethod
+    async def get_service_reviews(db: AsyncSession, service_id: UUID, sort: str = "newest",
+                                  limit: int = 50, cursor: Optional[str] = None):
+        logger.info("Fetching reviews for service %s: sort=%s, limit=%s, cursor=%s", service_id, sort, limit, cursor)
+
+        result = await db.scalars(Review_Crud.service_reviews_query(service_id, sort, cursor).limit(limit + 1))
+        reviews = result.all()
+
+        next_cursor = None
+        if len(reviews) > limit:
+            reviews = reviews[:limit]
+            last = reviews[-1]
+            if sort == "rating":
+                next_cursor = encode_ranked_cursor(last.rating, last.created_at, last.id)
+            else:
+                next_cursor = encode_cursor(last.created_at, last.id)
+
+        return reviews, next_cursor
+
+    @staticmethod
+    async def stream_reviews(query):
+        # Owns its session: a streaming response outlives the request's dependencies
+        async with read_session() as db:
+            result = await db.stream_scalars(query.execution_options(yield_per=REVIEW_STREAM_BATCH_SIZE))
+            async for reviews in result.partitions():
+                yield reviews
+
+    @staticmethod
+    async def get_review(db: AsyncSession, review_id: UUID) -> Optional[Review]:
         try:
-            logger.info(f"Fetching review {review_id}")
-            return db.query(Review).filter(Review.id == review_id).first()
+            logger.info("Fetching review %s", review_id)
+            return await db.scalar(select(Review).where(Review.id == review_id))
         except Exception as e:
-            logger.error(f"Error fetching review {review_id}: {str(e)}")
+            logger.error("Error fetching review %s: %s", review_id, e)
             raise
 
     @staticmethod
-    def update_review(db: Session, review_id: UUID, update_data: ReviewUpdate, user: User) -> Optional[Review]:
+    async def update_review(db: AsyncSession, review_id: UUID, update_data: ReviewUpdate, user: User) -> Optional[Review]:
         try:
-            logger.info(f"Attempting to update review {review_id} by user {user.id}")
+            logger.info("Attempting to update review %s by user %s", review_id, user.id)
 
-            review = db.query(models.Review).filter(models.Review.id == review_id).first()
+            review = await db.scalar(select(models.Review).where(models.Review.id == review_id))
             if not review:
-                logger.warning(f"Review {review_id} not found")
+                logger.warning("Review %s not found", review_id)
                 return None
 
             # Check if user owns the review or is admin
             if user.role != Role.ADMIN and review.user_id != user.id:
-                logger.warning(f"User {user.id} not authorized to update review {review_id}")
+                logger.warning("User %s not authorized to update review %s", user.id, review_id)
                 raise PermissionError("Not authorized to update this review")
 
             # Update fields if provided
-            if update_data.rating is not None:
+            if update_data.rating is not None and update_data.rating != review.rating:
+                previous_rating = review.rating
                 review.rating = update_data.rating
+                await Rating_Crud.record_rating(db, review.service_id, added=update_data.rating, removed=previous_rating)
             if update_data.comment is not None:
                 review.comment = update_data.comment
 
             review.updated_at = datetime.now(timezone.utc)
-            db.commit()
-            db.refresh(review)
+            await db.commit()
+            await db.refresh(review)
 
-            logger.info(f"Review {review_id} updated successfully")
+            logger.info("Review %s updated successfully", review_id)
             return review
 
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error updating review {review_id}: {str(e)}")
+            await db.rollback()
+            logger.error("Error updating review %s: %s", review_id, e)
             raise
 
     @staticmethod
-    def delete_review(db: Session, review_id: UUID, user: User) -> bool:
+    async def delete_review(db: AsyncSession, review_id: UUID, user: User) -> bool:
         try:
-            logger.info(f"Attempting to delete review {review_id} by user {user.id}")
+            logger.info("Attempting to delete review %s by user %s", review_id, user.id)
 
-            review = db.query(Review).filter(Review.id == review_id).first()
+            review = await db.scalar(select(Review).where(Review.id == review_id))
             if not review:
-                logger.warning(f"Review {review_id} not found")
+                logger.warning("Review %s not found", review_id)
                 return False
 
             # Check if user owns the review or is admin
             if user.role != Role.ADMIN and review.user_id != user.id:
-                logger.warning(f"User {user.id} not authorized to delete review {review_id}")
+                logger.warning("User %s not authorized to delete review %s", user.id, review_id)
                 raise PermissionError("Not authorized to delete this review")
 
-            db.delete(review)
-            db.commit()
+            await db.delete(review)
+            await Rating_Crud.record_rating(db, review.service_id, removed=review.rating)
+            await db.commit()
 
-            logger.info(f"Review {review_id} deleted successfully")
+            logger.info("Review %s deleted successfully", review_id)
             return True
 
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error deleting review {review_id}: {str(e)}")
+            await db.rollback()
+            logger.error("Error deleting review %s: %s", review_id, e)
             raise
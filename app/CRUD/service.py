@@ -1,12 +1,21 @@
+import hashlib
 import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, NamedTuple, Optional
 from uuid import UUID
 from sqlalchemy.sql.functions import current_user
 from app import models
-from app.database import get_db
+from app.cache import TTLCache
+from app.database import AsyncSessionLocal
 from app.models import Service, User
+from app.pagination import encode_cursor, decode_cursor
+from app.responses import dump_json
+from app.schemas.booking import BookingStatus
 from app.schemas.service import ServiceOut, ServiceCreate, ServiceUpdate
 from app.schemas.user import Role
 from app.security import get_current_user
@@ -15,71 +24,204 @@ from app.security import get_current_user
 
 logger = logging.getLogger(__name__)
 
+AVAILABILITY_MAX_DAYS = 31
+
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", 256))
+CATALOG_CACHE_TTL_SECONDS = int(os.getenv("CATALOG_CACHE_TTL_SECONDS", 300))
+
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL_SECONDS)
+
+# Bumped on every invalidation so a page read before a write can't be cached after it
+_catalog_generation = 0
+
+
+class CatalogPage(NamedTuple):
+    body: bytes
+    etag: str
+    next_cursor: Optional[str]
+
+
 class Service:
     @staticmethod
-    def get_services(
-        db: Session,
+    async def get_services(
+        db: AsyncSession,
         price_min: Optional[float] = None,
         price_max: Optional[float] = None,
         active: Optional[bool] = True,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ):
-        query = db.query(models.Service)
-        logger.info("Fetching services with filters: "
-                    f"price_min={price_min}, price_max={price_max}, active={active}, "
-                    f"skip={skip}, limit={limit}")
+        query = select(models.Service)
+        logger.info("Fetching services with filters: price_min=%s, price_max=%s, active=%s, "
+                    "skip=%s, limit=%s, cursor=%s", price_min, price_max, active, skip, limit, cursor)
 
         if price_min is not None:
-            query = query.filter(models.Service.price >= price_min)
+            query = query.where(models.Service.price >= price_min)
 
         if price_max is not None:
-            query = query.filter(models.Service.price <= price_max)
+            query = query.where(models.Service.price <= price_max)
 
         if active is not None:
-            query = query.filter(models.Service.is_active == active)
+            query = query.where(models.Service.is_active == active)
+
+        query = query.order_by(models.Service.created_at.desc(), models.Service.id.desc())
+
+        if cursor:
+            # Keyset page: seek past the last row seen, no offset and no count
+            last_created_at, last_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(models.Service.created_at, models.Service.id) < tuple_(last_created_at, last_id)
+            )
+            total = None
+        else:
+            total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+            query = query.offset(skip)
 
-        total = query.count()
+        result = await db.scalars(query.limit(limit + 1))
+        services = result.all()
 
+        next_cursor = None
+        if len(services) > limit:
+            services = services[:limit]
+            next_cursor = encode_cursor(services[-1].created_at, services[-1].id)
 
-        services = query.order_by(models.Service.created_at.desc()).offset(skip).limit(limit).all()
-        logger.info(f"Retrieved {len(services)} services out of {total} total matching services")
+        logger.info("Retrieved %s services out of %s total matching services", len(services), total)
 
-        return services, total
+        return services, total, next_cursor
 
     @staticmethod
-    def get_service(db: Session, service_id: UUID):
-        logging.info(f"Checking if service exists: {service_id}")
+    async def get_catalog_page(
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        active: Optional[bool] = True,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> CatalogPage:
+        key = (price_min, price_max, active, skip, limit, cursor)
+        page = catalog_cache.get(key)
+        if page is not None:
+            return page
+
+        generation = _catalog_generation
+        # Filled from the primary: a replica that hasn't applied the write behind the last
+        # invalidation would get its stale page cached for the whole TTL. Misses are rare
+        # enough that this costs the primary little.
+        async with AsyncSessionLocal() as db:
+            services, total, next_cursor = await Service.get_services(
+                db, price_min, price_max, active, skip, limit, cursor
+            )
+
+        body = dump_json(List[ServiceOut], services)
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        page = CatalogPage(body, etag, next_cursor)
+
+        if generation == _catalog_generation:
+            catalog_cache.set(key, page)
+        return page
+
+    @staticmethod
+    def invalidate_catalog():
+        global _catalog_generation
+        _catalog_generation += 1
+        catalog_cache.clear()
+        logger.info("Service catalog cache invalidated")
+
+    @staticmethod
+    async def get_service(db: AsyncSession, service_id: UUID):
+        logging.info("Checking if service exists: %s", service_id)
         try:
-            service = db.query(models.Service).filter(models.Service.id == service_id).first()
+            service = await db.scalar(select(models.Service).where(models.Service.id == service_id))
 
             if not service:
-                logging.warning(f"Service not found: {service_id}")
+                logging.warning("Service not found: %s", service_id)
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Service not found"
                 )
 
             if not service.is_active:
-                logging.warning(f"Service is inactive: {service_id}")
+                logging.warning("Service is inactive: %s", service_id)
                 raise HTTPException(
                     status_code=status.HTTP_410_GONE,
                     detail="Service is not available"
                 )
-            logging.info(f"Service found: {service_id}")
+            logging.info("Service found: %s", service_id)
             return service
 
         except HTTPException:
             raise
         except Exception as e:
-            logging.error(f"Error retrieving service {service_id}: {str(e)}")
+            logging.error("Error retrieving service %s: %s", service_id, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error retrieving service: {str(e)}"
             )
 
     @staticmethod
-    def create_service(db: Session, service_data: ServiceCreate):
+    async def get_availability(
+        db: AsyncSession,
+        service_id: UUID,
+        from_time: datetime,
+        to_time: datetime,
+        granularity_minutes: Optional[int] = None
+    ):
+        if from_time.tzinfo is None:
+            from_time = from_time.replace(tzinfo=timezone.utc)
+        if to_time.tzinfo is None:
+            to_time = to_time.replace(tzinfo=timezone.utc)
+
+        if to_time <= from_time:
+            raise ValueError("'to' must be after 'from'")
+        if to_time - from_time > timedelta(days=AVAILABILITY_MAX_DAYS):
+            raise ValueError(f"Availability window cannot exceed {AVAILABILITY_MAX_DAYS} days")
+
+        service = await Service.get_service(db, service_id)
+        duration = timedelta(minutes=service.duration_minutes)
+        step = timedelta(minutes=granularity_minutes or service.duration_minutes)
+
+        # One range query for every booking that can block a slot in the window
+        result = await db.execute(select(models.Booking.start_time, models.Booking.end_time).where(
+            models.Booking.service_id == service_id,
+            models.Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
+            models.Booking.start_time < to_time,
+            models.Booking.end_time > from_time
+        ).order_by(models.Booking.start_time))
+        busy = result.all()
+
+        merged = []
+        for start, end in busy:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        now = datetime.now(timezone.utc)
+        slots = []
+        slot_start = from_time
+        i = 0
+        while slot_start + duration <= to_time:
+            slot_end = slot_start + duration
+            while i < len(merged) and merged[i][1] <= slot_start:
+                i += 1
+            if slot_start > now and (i == len(merged) or merged[i][0] >= slot_end):
+                slots.append({"start_time": slot_start, "end_time": slot_end})
+            slot_start += step
+
+        logger.info("Computed %s free slots for service %s from %s bookings", len(slots), service_id, len(busy))
+
+        return {
+            "service_id": service_id,
+            "from_time": from_time,
+            "to_time": to_time,
+            "duration_minutes": service.duration_minutes,
+            "granularity_minutes": int(step.total_seconds() // 60),
+            "slots": slots
+        }
+
+    @staticmethod
+    async def create_service(db: AsyncSession, service_data: ServiceCreate):
         service = models.Service(
             title=service_data.title,
             description=service_data.description,
@@ -89,13 +231,43 @@ class Service:
 
 
         db.add(service)
-        db.flush()
-        db.refresh(service)
+        await db.flush()
+        await db.refresh(service)
         return service
 
     @staticmethod
-    def update_service(db: Session, service_id: UUID, service_data: ServiceUpdate):
-        service = db.query(models.Service).filter(models.Service.id == service_id).first()
+    async def bulk_create_services(db: AsyncSession, services: List[ServiceCreate]) -> int:
+        # COPY into a transaction-scoped staging table through the raw psycopg connection,
+        # then move everything across with a single INSERT ... SELECT
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        async with raw.driver_connection.cursor() as cursor:
+            await cursor.execute(
+                "CREATE TEMP TABLE services_import "
+                "(id uuid, title varchar(50), description text, price numeric(10, 2), duration_minutes integer) "
+                "ON COMMIT DROP"
+            )
+            async with cursor.copy(
+                "COPY services_import (id, title, description, price, duration_minutes) FROM STDIN"
+            ) as copy:
+                for service in services:
+                    await copy.write_row(
+                        (uuid.uuid4(), service.title, service.description, service.price, service.duration_minutes)
+                    )
+
+        result = await db.execute(text(
+            "INSERT INTO services (id, title, description, price, duration_minutes, is_active) "
+            "SELECT id, title, description, price, duration_minutes, true FROM services_import"
+        ))
+        await db.commit()
+        Service.invalidate_catalog()
+
+        logger.info("Bulk imported %s services", result.rowcount)
+        return result.rowcount
+
+    @staticmethod
+    async def update_service(db: AsyncSession, service_id: UUID, service_data: ServiceUpdate):
+        service = await db.scalar(select(models.Service).where(models.Service.id == service_id))
         if not service:
             return None
 
@@ -103,20 +275,21 @@ class Service:
         for field, value in update_data.items():
             setattr(service, field, value)
 
-        db.flush()
-        db.refresh(service)
+        await db.flush()
+        await db.refresh(service)
         return service
 
         return service
 
     @staticmethod
-    def delete_service(db: Session, service_id: UUID):
-        service = db.query(models.Service).filter(models.Service.id == service_id).first()
+    async def delete_service(db: AsyncSession, service_id: UUID):
+        service = await db.scalar(select(models.Service).where(models.Service.id == service_id))
         if not service:
             return False
 
-        db.delete(service)
-        db.commit()
+        await db.delete(service)
+        await db.commit()
+        Service.invalidate_catalog()
         return True
 
 
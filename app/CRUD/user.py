@@ -1,8 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import Optional
 import logging
 from app.models import User
+from app.security import invalidate_principal
 
 logger = logging.getLogger(__name__)
 
@@ -10,54 +12,55 @@ logger = logging.getLogger(__name__)
 class User_Crud:
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
         try:
-            return db.query(User).filter(User.id == user_id).first()
+            return await db.scalar(select(User).where(User.id == user_id))
         except Exception as e:
-            logger.error(f"Error getting user {user_id}: {str(e)}")
+            logger.error("Error getting user %s: %s", user_id, e)
             raise
 
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         try:
-            return db.query(User).filter(User.email == email).first()
+            return await db.scalar(select(User).where(User.email == email))
         except Exception as e:
-            logger.error(f"Error getting user by email {email}: {str(e)}")
+            logger.error("Error getting user by email %s: %s", email, e)
             raise
 
     @staticmethod
-    def update_user(db: Session, user_id: UUID, update_data: dict) -> Optional[User]:
+    async def update_user(db: AsyncSession, user_id: UUID, update_data: dict) -> Optional[User]:
         try:
-            logger.info(f"Updating user {user_id} with data: {update_data}")
+            logger.info("Updating user %s with data: %s", user_id, update_data)
 
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.scalar(select(User).where(User.id == user_id))
             if not user:
-                logger.warning(f"User {user_id} not found for update")
+                logger.warning("User %s not found for update", user_id)
                 return None
 
             # Check if email is being updated and if it's already taken
             if 'email' in update_data and update_data['email'] != user.email:
-                existing_user = User_Crud.get_user_by_email(db, update_data['email'])
+                existing_user = await User_Crud.get_user_by_email(db, update_data['email'])
                 if existing_user:
-                    logger.warning(f"Email {update_data['email']} already taken")
+                    logger.warning("Email %s already taken", update_data['email'])
                     raise ValueError("Email already registered")
 
             for field, value in update_data.items():
                 if value is not None and hasattr(user, field):
                     setattr(user, field, value)
 
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+            invalidate_principal(user_id)
 
-            logger.info(f"User {user_id} updated successfully")
+            logger.info("User %s updated successfully", user_id)
             return user
 
         except ValueError as e:
-            db.rollback()
-            logger.warning(f"Validation error updating user {user_id}: {str(e)}")
+            await db.rollback()
+            logger.warning("Validation error updating user %s: %s", user_id, e)
             raise
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error updating user {user_id}: {str(e)}")
+            await db.rollback()
+            logger.error("Error updating user %s: %s", user_id, e)
             raise
 
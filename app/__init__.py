@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+
+# Settings are read with os.getenv when each module is imported, so .env is loaded
+# once here, before any app module runs
+load_dotenv()
@@ -0,0 +1,32 @@
+"""Maintenance commands.
+
+    python -m app.cli rebuild-ratings [--service-id UUID]
+"""
+import argparse
+import asyncio
+from uuid import UUID
+from app.CRUD.rating import Rating_Crud
+from app.database import AsyncSessionLocal, async_engine
+
+
+async def rebuild_ratings(service_id=None):
+    async with AsyncSessionLocal() as db:
+        rebuilt = await Rating_Crud.rebuild(db, service_id)
+    await async_engine.dispose()
+    print(f"Rebuilt rating stats for {rebuilt} services")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-ratings", help="recompute service_rating_stats from the reviews table")
+    rebuild.add_argument("--service-id", type=UUID, help="only rebuild this service")
+
+    args = parser.parse_args()
+    if args.command == "rebuild-ratings":
+        asyncio.run(rebuild_ratings(args.service_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,225 @@
+import asyncio
+import itertools
+import logging
 import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-load_dotenv()
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL environment variable is not set")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 10))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+# Connections opened per pool at startup; 0 leaves the pool to fill on demand
+DB_POOL_WARM_CONNECTIONS = int(os.getenv("DB_POOL_WARM_CONNECTIONS", DB_POOL_SIZE))
+
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_STRATEGY = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+DB_REPLICA_RETRY_SECONDS = int(os.getenv("DB_REPLICA_RETRY_SECONDS", 30))
+
+logger = logging.getLogger(__name__)
+
+
+def get_async_url(url: str) -> str:
+    # psycopg 3 ships the async driver; a bare postgres URL would pick psycopg2
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+def get_engine_options() -> dict:
+    connect_args = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def get_pool_status(pool) -> dict:
+    status = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
+    if isinstance(pool, TimedAsyncAdaptedQueuePool):
+        status.update({
+            "checkouts": pool.wait_count,
+            "timeouts": pool.timeouts,
+            "wait_seconds_avg": pool.wait_seconds_total / pool.wait_count if pool.wait_count else 0.0,
+            "wait_seconds_max": pool.wait_seconds_max,
+        })
+    return status
+
+
+# Creating an engine doesn't connect; the pool opens connections on first checkout,
+# or up front in warm_pool() from the app's lifespan
+async_engine = create_async_engine(
+    get_async_url(DATABASE_URL), poolclass=TimedAsyncAdaptedQueuePool, **get_engine_options()
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class ReplicaRouter:
+    """Picks a read replica per session and skips replicas that recently failed."""
+
+    def __init__(self, urls, strategy: str = "round_robin", retry_seconds: int = 30):
+        if strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self.engines = [
+            create_async_engine(get_async_url(url), poolclass=TimedAsyncAdaptedQueuePool, **get_engine_options())
+            for url in urls
+        ]
+        self.sessionmakers = {
+            engine: async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for engine in self.engines
+        }
+        self._unhealthy_until = {}
+        self._counter = itertools.count()
+
+    def is_healthy(self, engine) -> bool:
+        return self._unhealthy_until.get(engine, 0.0) <= time.monotonic()
+
+    def mark_unhealthy(self, engine):
+        self._unhealthy_until[engine] = time.monotonic() + self.retry_seconds
+
+    def candidates(self):
+        healthy = [engine for engine in self.engines if self.is_healthy(engine)]
+        if not healthy:
+            return []
+        if self.strategy == "least_loaded":
+            return sorted(healthy, key=lambda engine: engine.pool.checkedout())
+        start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    async def open_session(self):
+        for engine in self.candidates():
+            session = self.sessionmakers[engine]()
+            try:
+                # Check out the connection now so a dead replica falls through to the next one
+                await session.connection()
+                return session
+            except exc.TimeoutError:
+                await session.close()
+                logger.warning("Replica %s pool exhausted, trying next", engine.url.host)
+            except exc.DBAPIError as e:
+                await session.close()
+                self.mark_unhealthy(engine)
+                logger.warning("Replica %s unavailable, skipping for %ss: %s",
+                               engine.url.host, self.retry_seconds, e)
+        return None
+
+    async def connect(self, **execution_options):
+        for engine in self.candidates():
+            conn = engine.connect()
+            try:
+                await conn.start()
+                return await conn.execution_options(**execution_options)
+            except exc.TimeoutError:
+                await conn.close()
+                logger.warning("Replica %s pool exhausted, trying next", engine.url.host)
+            except exc.DBAPIError as e:
+                await conn.close()
+                self.mark_unhealthy(engine)
+                logger.warning("Replica %s unavailable, skipping for %ss: %s",
+                               engine.url.host, self.retry_seconds, e)
+        return None
+
+    def status(self) -> list:
+        return [
+            {"host": f"{engine.url.host}:{engine.url.port or 5432}", "healthy": self.is_healthy(engine), **get_pool_status(engine.pool)}
+            for engine in self.engines
+        ]
+
+
+replica_router = ReplicaRouter(DATABASE_REPLICA_URLS, DB_REPLICA_STRATEGY, DB_REPLICA_RETRY_SECONDS)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def warm_pool(engine, connections: int = DB_POOL_WARM_CONNECTIONS) -> int:
+    """Open connections concurrently and return them to the pool so first requests skip the handshake."""
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(min(connections, DB_POOL_SIZE))), return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    if results and not opened:
+        raise results[0]
+    return len(opened)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+
+@asynccontextmanager
+async def read_session():
+    # Read-only work uses a replica when one is configured and healthy, else the primary
+    session = await replica_router.open_session() or AsyncSessionLocal()
+    async with session:
+        yield session
+
+
+@asynccontextmanager
+async def read_connection(**execution_options):
+    # Core connection for long read-only scans, e.g. exports with their own isolation level
+    conn = await replica_router.connect(**execution_options)
+    if conn is None:
+        conn = async_engine.connect()
+        await conn.start()
+        await conn.execution_options(**execution_options)
+    async with conn:
+        yield conn
+
+
+async def get_read_db():
+    async with read_session() as session:
+        yield session
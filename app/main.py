@@ -1,16 +1,62 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.auth import auth_router
-from . import models
-from .database import engine
+from .database import async_engine, AsyncSessionLocal, replica_router, warm_pool
+from .hashing import password_hasher
+from .logger import configure_logging
+from .metrics import setup_metrics
+from .profiling import setup_profiling
+from .responses import add_compression
+from .revocation import revoked_tokens
+from .router.admin import admin_router
 from .router.booking import booking_router
 from .router.review import review_router
 from .router.service import service_router
 from .router.user import user_router
+from .workers import periodic_tasks
 
-models.Base.metadata.create_all(bind=engine)
+configure_logging()
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is managed by Alembic (alembic upgrade head), never created here.
+    # A database that is briefly unreachable only delays these steps to the first request.
+    for db_engine in [async_engine] + replica_router.engines:
+        try:
+            warmed = await warm_pool(db_engine)
+            logger.info("Warmed %s connections to %s", warmed, db_engine.url.host)
+        except Exception as e:
+            logger.warning("Could not warm the pool for %s: %s", db_engine.url.host, e)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            loaded = await revoked_tokens.sync(db)
+        logger.info("Loaded %s revoked tokens", loaded)
+    except Exception as e:
+        logger.error("Could not load revoked tokens at startup: %s", e)
+
+    revocation_sync = asyncio.create_task(revoked_tokens.run_sync(AsyncSessionLocal))
+    workers = [task for task in (worker.start(AsyncSessionLocal) for worker in periodic_tasks) if task]
+    yield
+    revocation_sync.cancel()
+    for task in workers:
+        task.cancel()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    for db_engine in replica_router.engines:
+        await db_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+add_compression(app)
+setup_metrics(app)
+setup_profiling(app)
 
 
 app.include_router(auth_router)
@@ -18,6 +64,7 @@ app.include_router(user_router)
 app.include_router(service_router)
 app.include_router(booking_router)
 app.include_router(review_router)
+app.include_router(admin_router)
 
 @app.get("/")
 def home():
@@ -25,4 +72,4 @@ def home():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
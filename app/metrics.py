@@ -0,0 +1,131 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from starlette.responses import Response
+
+from app.database import async_engine, get_pool_status, replica_router
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "Requests currently being served", ["method"])
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed, by route", ["route"])
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_TIME_PER_REQUEST = Histogram("db_time_per_request_seconds", "Time spent in SQL per request", ["route"])
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set per request by the middleware; SQLAlchemy runs cursor events in a greenlet that
+# inherits the request's context, so the events below can attribute queries to it
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(sync_engine):
+    if not event.contains(sync_engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def route_template(scope) -> str:
+    # Label by template (/bookings/{booking_id}), never the raw path, to bound cardinality
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats()
+        token = request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            request_stats.reset(token)
+
+            route = route_template(scope)
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(elapsed)
+            DB_QUERIES.labels(route).inc(stats.queries)
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.db_seconds)
+
+
+class PoolCollector:
+    """Reads pool counters at scrape time instead of keeping gauges in sync."""
+
+    FIELDS = ("size", "checked_in", "checked_out", "overflow", "checkouts", "timeouts", "wait_seconds_max")
+
+    def collect(self):
+        families = {
+            field: GaugeMetricFamily(f"db_pool_{field}", f"Connection pool {field.replace('_', ' ')}", labels=["pool"])
+            for field in self.FIELDS
+        }
+        pools = [("primary", get_pool_status(async_engine.pool))]
+        pools += [(replica["host"], replica) for replica in replica_router.status()]
+        for name, pool_status in pools:
+            for field, family in families.items():
+                if field in pool_status:
+                    family.add_metric([name], pool_status[field])
+        return list(families.values())
+
+
+def setup_metrics(app):
+    if not METRICS_ENABLED:
+        return
+
+    for sync_engine in [async_engine.sync_engine] + [replica.sync_engine for replica in replica_router.engines]:
+        instrument_engine(sync_engine)
+    REGISTRY.register(PoolCollector())
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,7 @@
 import uuid
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, ForeignKey, Boolean, DateTime, Integer, Numeric, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, ForeignKey, Boolean, DateTime, Integer, Numeric, Enum, DDL, Index, event, text
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import Text
 from app.database import Base
@@ -34,7 +34,24 @@ class Service(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     bookings = relationship("Booking", back_populates="service", cascade="all, delete-orphan")
+    rating_stats = relationship("ServiceRatingStats", back_populates="service", uselist=False,
+                                lazy="joined", cascade="all, delete-orphan")
 
+    @property
+    def review_count(self) -> int:
+        return self.rating_stats.review_count if self.rating_stats else 0
+
+    @property
+    def average_rating(self):
+        return self.rating_stats.average_rating if self.rating_stats else None
+
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), with and without the is_active filter
+        Index("ix_services_created_at_id", "created_at", "id"),
+        Index("ix_services_is_active_created_at_id", "is_active", "created_at", "id"),
+        # Price range filters on the active catalog
+        Index("ix_services_is_active_price", "is_active", "price"),
+    )
 
 
 class Booking(Base):
@@ -52,12 +69,37 @@ class Booking(Base):
     service = relationship("Service", back_populates="bookings")
     review = relationship("Review", back_populates="booking", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Two active bookings of the same service may never overlap
+        ExcludeConstraint(
+            (service_id, "="),
+            (text("tstzrange(start_time, end_time)"), "&&"),
+            name="excl_bookings_service_overlap",
+            using="gist",
+            where=text("status IN ('PENDING', 'CONFIRMED')"),
+        ),
+        # Keyset pagination on (start_time, id) for admins and per user
+        Index("ix_bookings_start_time_id", "start_time", "id"),
+        Index("ix_bookings_user_id_start_time_id", "user_id", "start_time", "id"),
+        # Range lookups of active bookings per service (availability, rescheduling)
+        Index(
+            "ix_bookings_active_service_id_start_time",
+            "service_id", "start_time", "end_time",
+            postgresql_where=text("status IN ('PENDING', 'CONFIRMED')"),
+        ),
+        # Confirmed bookings that have ended, for the auto-completion worker
+        Index("ix_bookings_confirmed_end_time", "end_time", postgresql_where=text("status = 'CONFIRMED'")),
+    )
+
+
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
 
 class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, nullable=False, default=uuid.uuid4)
-    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"), nullable=False)
     rating = Column(Integer, nullable=False)
@@ -68,9 +110,41 @@ class Review(Base):
     user = relationship("User", backref="reviews")
     service = relationship("Service", backref="reviews")
 
+    __table_args__ = (
+        # Keyset pagination of a service's reviews, newest first or by rating
+        Index("ix_reviews_service_id_created_at_id", "service_id", "created_at", "id"),
+        Index("ix_reviews_service_id_rating_created_at_id", "service_id", "rating", "created_at", "id"),
+    )
+
+
+class ServiceRatingStats(Base):
+    __tablename__ = "service_rating_stats"
+
+    service_id = Column(UUID(as_uuid=True), ForeignKey("services.id", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    service = relationship("Service", back_populates="rating_stats")
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.review_count, 2) if self.review_count else None
+
+    @property
+    def histogram(self) -> dict:
+        return {str(rating): getattr(self, f"rating_{rating}") for rating in range(1, 6)}
+
 
 class BlacklistedToken(Base):
     __tablename__ = "blacklisted_tokens"
 
     token = Column(String, primary_key=True)
-    blacklisted_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    jti = Column(String, nullable=True, index=True)
+    blacklisted_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
\ No newline at end of file
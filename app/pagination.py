@@ -0,0 +1,33 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    raw = json.dumps([sort_value.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_ranked_cursor(rank: int, sort_value: datetime, row_id: UUID) -> str:
+    raw = json.dumps([rank, sort_value.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_ranked_cursor(cursor: str) -> Tuple[int, datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(rank), datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
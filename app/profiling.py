@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.cache import TTLCache
+from app.database import async_engine, replica_router
+from app.metrics import route_template
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.slow_query")
+
+SQL_PROFILING = os.getenv("SQL_PROFILING", "false").lower() == "true"
+SQL_N_PLUS_ONE_DETECTION = os.getenv("SQL_N_PLUS_ONE_DETECTION", "false").lower() == "true"
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 3))
+SQL_SLOW_QUERY_MS = int(os.getenv("SQL_SLOW_QUERY_MS", 200))
+SQL_EXPLAIN_INTERVAL_SECONDS = int(os.getenv("SQL_EXPLAIN_INTERVAL_SECONDS", 300))
+
+# A slow statement is explained at most once per interval, so a slow endpoint under load
+# doesn't turn into a stream of EXPLAIN ANALYZE runs
+explained_statements = TTLCache(maxsize=1000, ttl=SQL_EXPLAIN_INTERVAL_SECONDS)
+
+
+class QueryProfile:
+    __slots__ = ("scope", "queries", "db_seconds", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = Counter()
+
+
+class RouteStats:
+    """Per-route totals for GET /admin/sql."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, profile: QueryProfile, repeated: int):
+        with self._lock:
+            stats = self._routes.setdefault(route, {"requests": 0, "queries": 0, "db_ms": 0.0,
+                                                    "max_queries": 0, "n_plus_one": 0})
+            stats["requests"] += 1
+            stats["queries"] += profile.queries
+            stats["db_ms"] += profile.db_seconds * 1000
+            stats["max_queries"] = max(stats["max_queries"], profile.queries)
+            stats["n_plus_one"] += repeated
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: {**stats, "avg_queries": stats["queries"] / stats["requests"],
+                        "avg_db_ms": stats["db_ms"] / stats["requests"]}
+                for route, stats in sorted(self._routes.items(), key=lambda item: -item[1]["db_ms"])
+            }
+
+
+route_stats = RouteStats()
+query_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+# EXPLAIN runs on the async engine that owns the sync engine the statement came from
+_async_engines = {}
+
+
+def is_explainable(statement: str) -> bool:
+    # ANALYZE executes the statement, so only plain reads are explained
+    sql = statement.lstrip().upper()
+    return sql.startswith("SELECT") and " FOR UPDATE" not in sql
+
+
+async def explain_slow_query(async_db_engine, statement: str, parameters, elapsed_ms: float, route: str):
+    # The task inherited the request's context; keep the EXPLAIN out of its query counts
+    query_profile.set(None)
+    try:
+        async with async_db_engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                plan = "\n".join(row[0] for row in result)
+            finally:
+                await transaction.rollback()
+        slow_query_logger.warning("Slow query on %s (%.1f ms):\n%s\n%s", route, elapsed_ms, statement, plan)
+    except Exception as e:
+        slow_query_logger.warning("Slow query on %s (%.1f ms), EXPLAIN failed: %s\n%s", route, elapsed_ms, e, statement)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profile_start"].pop()
+    profile = query_profile.get()
+    if profile is None:
+        return
+
+    profile.queries += 1
+    profile.db_seconds += elapsed
+    if SQL_N_PLUS_ONE_DETECTION:
+        profile.statements[statement] += 1
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms < SQL_SLOW_QUERY_MS:
+        return
+    async_db_engine = _async_engines.get(conn.engine)
+    if async_db_engine is None or executemany or not is_explainable(statement):
+        slow_query_logger.warning("Slow query (%.1f ms):\n%s", elapsed_ms, statement)
+        return
+    if explained_statements.get(statement):
+        return
+    explained_statements.set(statement, True)
+    # Off the request path and on its own connection
+    asyncio.get_running_loop().create_task(
+        explain_slow_query(async_db_engine, statement, parameters, elapsed_ms, route_template(profile.scope))
+    )
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(scope)
+        token = query_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", (f'db;dur={profile.db_seconds * 1000:.1f};'
+                                                   f'desc="{profile.queries} queries"').encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_profile.reset(token)
+            route = route_template(scope)
+
+            repeated = 0
+            for statement, count in profile.statements.items():
+                if count >= SQL_N_PLUS_ONE_THRESHOLD:
+                    repeated += 1
+                    logger.warning("Possible N+1 on %s %s: statement ran %s times\n%s",
+                                   scope["method"], route, count, statement)
+
+            route_stats.record(f"{scope['method']} {route}", profile, repeated)
+            logger.debug("%s %s: %s queries, %.1f ms in SQL",
+                         scope["method"], route, profile.queries, profile.db_seconds * 1000)
+
+
+def setup_profiling(app):
+    if not SQL_PROFILING:
+        return
+
+    for async_db_engine in [async_engine] + replica_router.engines:
+        _async_engines[async_db_engine.sync_engine] = async_db_engine
+        event.listen(async_db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(async_db_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    app.add_middleware(ProfilingMiddleware)
@@ -0,0 +1,43 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Optional
+from fastapi import FastAPI, Response
+from pydantic import TypeAdapter
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", 1000))
+
+
+@lru_cache(maxsize=None)
+def get_adapter(schema: Any) -> TypeAdapter:
+    # Building a TypeAdapter compiles a validator and serializer, so do it once per schema
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, data: Any) -> bytes:
+    adapter = get_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(schema: Any, data: Any, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    # Rows are validated and serialized once here instead of again through response_model
+    return Response(content=dump_json(schema, data), status_code=status_code,
+                    headers=headers, media_type="application/json")
+
+
+def add_compression(app: FastAPI):
+    if RESPONSE_COMPRESSION_MIN_BYTES <= 0:
+        return
+    if BrotliMiddleware is not None:
+        app.add_middleware(BrotliMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES, gzip_fallback=True)
+    else:
+        logger.warning("brotli-asgi is not installed, compressing responses with gzip only")
+        app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES)
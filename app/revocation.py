@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import jwt
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import BlacklistedToken
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", 30))
+# Each sync re-reads this far behind the watermark: a logout whose transaction commits
+# after a sync can carry a blacklisted_at older than the newest row that sync saw
+REVOCATION_SYNC_OVERLAP_SECONDS = int(os.getenv("REVOCATION_SYNC_OVERLAP_SECONDS", 2 * REVOCATION_SYNC_SECONDS))
+
+
+def revocation_key(token: str, payload: dict) -> str:
+    # Tokens issued before jti existed are keyed by a digest of the token itself
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationStore:
+    """In-process set of revoked token ids, each kept only until the token's own expiry."""
+
+    def __init__(self):
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self.last_synced_at: Optional[datetime] = None
+
+    def add(self, key: str, expires_at: float) -> bool:
+        if expires_at <= time.time():
+            return False
+        with self._lock:
+            added = key not in self._revoked
+            self._revoked[key] = expires_at
+        return added
+
+    def is_revoked(self, key: str) -> bool:
+        expires_at = self._revoked.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            with self._lock:
+                self._revoked.pop(key, None)
+            return False
+        return True
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, expires_at in self._revoked.items() if expires_at <= now]
+            for key in expired:
+                del self._revoked[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    async def sync(self, db: AsyncSession) -> int:
+        """Load tokens blacklisted since the last sync, with overlap (all of them on the first call)."""
+        query = select(BlacklistedToken.token, BlacklistedToken.jti,
+                       BlacklistedToken.blacklisted_at, BlacklistedToken.expires_at)
+        if self.last_synced_at is not None:
+            overlap = timedelta(seconds=REVOCATION_SYNC_OVERLAP_SECONDS)
+            query = query.where(BlacklistedToken.blacklisted_at > self.last_synced_at - overlap)
+        else:
+            # Rows without expires_at predate the column and are checked below
+            query = query.where(or_(BlacklistedToken.expires_at.is_(None),
+                                    BlacklistedToken.expires_at > func.now()))
+
+        loaded = 0
+        result = await db.execute(query)
+        for token, jti, blacklisted_at, expires_at in result:
+            if self.last_synced_at is None or blacklisted_at > self.last_synced_at:
+                self.last_synced_at = blacklisted_at
+            # Rows re-read from the overlap are already known and not counted again
+            if expires_at is not None:
+                loaded += self.add(jti or revocation_key(token, {}), expires_at.timestamp())
+                continue
+            try:
+                payload = jwt.decode(token, options={"verify_signature": False})
+            except jwt.PyJWTError:
+                continue
+            if "exp" not in payload:
+                continue
+            loaded += self.add(jti or revocation_key(token, payload), float(payload["exp"]))
+
+        self.purge_expired()
+        return loaded
+
+    async def run_sync(self, session_factory, interval: int = REVOCATION_SYNC_SECONDS) -> None:
+        # Picks up logouts handled by other instances
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as db:
+                    loaded = await self.sync(db)
+                if loaded:
+                    logger.info("Loaded %s revoked tokens, %s active", loaded, len(self))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error syncing revoked tokens: %s", e)
+
+    def stats(self) -> dict:
+        return {"size": len(self), "last_synced_at": self.last_synced_at}
+
+
+revoked_tokens = RevocationStore()
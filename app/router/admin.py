@@ -0,0 +1,56 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.CRUD.service import catalog_cache
+from app.database import async_engine, get_pool_status, replica_router
+from app.hashing import password_hasher
+from app.models import User
+from app.profiling import SQL_PROFILING, route_stats
+from app.revocation import revoked_tokens
+from app.schemas.user import Role
+from app.security import get_current_user, principal_cache
+from app.workers import periodic_tasks
+
+logger = logging.getLogger(__name__)
+
+admin_router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != Role.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+@admin_router.get("/pool", response_model=dict)
+async def get_pool_stats(current_user: User = Depends(require_admin)):
+    return {
+        "primary": get_pool_status(async_engine.pool),
+        "replicas": replica_router.status()
+    }
+
+
+@admin_router.get("/caches", response_model=dict)
+async def get_cache_stats(current_user: User = Depends(require_admin)):
+    return {
+        "principals": principal_cache.stats(),
+        "service_catalog": catalog_cache.stats(),
+        "revoked_tokens": revoked_tokens.stats()
+    }
+
+
+@admin_router.get("/hashing", response_model=dict)
+async def get_hashing_stats(current_user: User = Depends(require_admin)):
+    return password_hasher.stats()
+
+
+@admin_router.get("/workers", response_model=dict)
+async def get_worker_stats(current_user: User = Depends(require_admin)):
+    return {worker.name: worker.stats() for worker in periodic_tasks}
+
+
+@admin_router.get("/sql", response_model=dict)
+async def get_sql_stats(current_user: User = Depends(require_admin)):
+    return {"enabled": SQL_PROFILING, "routes": route_stats.snapshot()}
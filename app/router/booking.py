@@ -1,13 +1,19 @@
+import csv
+import io
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from datetime import datetime
-from typing import List, Optional
-from app.CRUD.booking import Booking_Crud
-from app.database import get_db
+from typing import List, Literal, Optional
+from app.CRUD.booking import Booking_Crud, EXPORT_COLUMNS
+from app.database import get_async_db, get_read_db
 from app.models import User
-from app.schemas.booking import BookingOut, BookingCreate, BookingStatus, BookingUpdate
+from app.responses import get_adapter, json_response
+from app.router.admin import require_admin
+from app.schemas.booking import (BookingOut, BookingCreate, BookingPage, BookingStatus, BookingUpdate,
+                                 BookingBatchStatus, BookingBatchStatusResult)
 from app.schemas.user import Role
 from app.security import get_current_user
 
@@ -16,59 +22,107 @@ booking_router = APIRouter(prefix="/bookings", tags=["bookings"])
 logger = logging.getLogger(__name__)
 
 @booking_router.post("/", response_model=BookingOut, status_code=status.HTTP_201_CREATED)
-def create_booking(
+async def create_booking(
         booking_data: BookingCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     try:
-        new_booking = Booking_Crud.create_booking(db, booking_data, current_user.id)
+        new_booking = await Booking_Crud.create_booking(db, booking_data, current_user.id)
         return new_booking
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logging.error(f"Error creating booking: {str(e)}")
-        db.rollback()
+        logging.error("Error creating booking: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@booking_router.get("/", response_model=dict)
-def get_bookings(
-        status: Optional[BookingStatus] = Query(None, description="Filter by status"),
+@booking_router.get("/", response_model=BookingPage)
+async def get_bookings(
+        booking_status: Optional[BookingStatus] = Query(None, alias="status", description="Filter by status"),
         from_date: Optional[datetime] = Query(None, description="Filter from date"),
         to_date: Optional[datetime] = Query(None, description="Filter to date"),
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=100),
-        db: Session = Depends(get_db),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+        db: AsyncSession = Depends(get_read_db),
         current_user: User = Depends(get_current_user)
 ):
     try:
-        bookings, total = Booking_Crud.get_bookings(
-            db, current_user, status, from_date, to_date, skip, limit
+        bookings, total, next_cursor = await Booking_Crud.get_bookings(
+            db, current_user, booking_status, from_date, to_date, skip, limit, cursor
         )
 
-        booking_models = [BookingOut.model_validate(booking) for booking in bookings]
-
-        return {
-            "data": booking_models,
+        return json_response(BookingPage, {
+            "data": bookings,
             "total": total,
             "skip": skip,
-            "limit": limit
-        }
+            "limit": limit,
+            "next_cursor": next_cursor
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(f"Error fetching bookings: {str(e)}")
+        logger.error("Error fetching bookings: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 
+async def export_csv(query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    async for rows in Booking_Crud.stream_export(query):
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else getattr(value, "value", value) for value in row]
+            for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def export_ndjson(query):
+    adapter = get_adapter(BookingOut)
+    async for rows in Booking_Crud.stream_export(query):
+        yield b"".join(adapter.dump_json(adapter.validate_python(row._mapping)) + b"\n" for row in rows)
+
+
+@booking_router.get("/export")
+async def export_bookings(
+        response_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+        from_date: Optional[datetime] = Query(None, alias="from", description="Bookings starting at or after"),
+        to_date: Optional[datetime] = Query(None, alias="to", description="Bookings starting at or before"),
+        booking_status: Optional[BookingStatus] = Query(None, alias="status", description="Filter by status"),
+        current_user: User = Depends(require_admin)
+):
+    logger.info("Booking export by %s: format=%s, from=%s, to=%s, status=%s",
+                current_user.id, response_format, from_date, to_date, booking_status)
+    query = Booking_Crud.export_query(booking_status, from_date, to_date)
+
+    if response_format == "ndjson":
+        body, media_type = export_ndjson(query), "application/x-ndjson"
+    else:
+        body, media_type = export_csv(query), "text/csv"
+
+    filename = f"bookings-{datetime.now().strftime('%Y%m%dT%H%M%S')}.{response_format}"
+    return StreamingResponse(body, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
 @booking_router.get("/{booking_id}", response_model=BookingOut)
-def get_booking(
+async def get_booking(
         booking_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_read_db),
         current_user: User = Depends(get_current_user)
 ):
-    logger.info(f"Fetching booking with ID: {booking_id}")
-    booking = Booking_Crud.get_booking(db, booking_id, current_user)
+    logger.info("Fetching booking with ID: %s", booking_id)
+    booking = await Booking_Crud.get_booking(db, booking_id, current_user)
     if not booking:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
     
@@ -77,15 +131,15 @@ def get_booking(
 
 
 @booking_router.patch("/{booking_id}", response_model=BookingOut)
-def update_booking(
+async def update_booking(
         booking_id: UUID,
         update_data: BookingUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
-    logger.info(f"Updating booking with ID: {booking_id}")
+    logger.info("Updating booking with ID: %s", booking_id)
     try:
-        updated_booking = Booking_Crud.update_booking(db, booking_id, update_data, current_user)
+        updated_booking = await Booking_Crud.update_booking(db, booking_id, update_data, current_user)
         if not updated_booking:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
 
@@ -93,38 +147,55 @@ def update_booking(
     except (ValueError, PermissionError) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(f"Error updating booking: {str(e)}")
-        db.rollback()
+        logger.error("Error updating booking: %s", e)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@booking_router.post("/batch-status", response_model=BookingBatchStatusResult)
+async def batch_update_status(
+        batch: BookingBatchStatus,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(require_admin)
+):
+    try:
+        updated, skipped = await Booking_Crud.batch_update_status(db, batch.ids, batch.status, current_user)
+        return {"status": batch.status, "updated": updated, "skipped": skipped}
+    except (ValueError, PermissionError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error updating booking statuses: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @booking_router.post("/{id}/complete", response_model=BookingOut)
-def complete_booking(
+async def complete_booking(
         booking_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     if current_user.role != Role.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
 
     try:
-        completed_booking = Booking_Crud.complete_booking(db, booking_id, current_user)
+        completed_booking = await Booking_Crud.complete_booking(db, booking_id, current_user)
         if not completed_booking:
             raise HTTPException(status_code=404, detail="Booking not found")
         return completed_booking
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @booking_router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_booking(
+async def delete_booking(
     booking_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
-        success = Booking_Crud.delete_booking(db, booking_id, current_user)
+        success = await Booking_Crud.delete_booking(db, booking_id, current_user)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -138,8 +209,8 @@ def delete_booking(
             detail=str(e)
         )
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error deleting booking: {str(e)}")
+        await db.rollback()
+        logger.error("Error deleting booking: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List, Optional
 import logging
 from app.CRUD.review import Review_Crud
-from app.database import get_db
+from app.database import get_async_db, get_read_db
 from app.models import User
 from app.schemas.review import ReviewOut, ReviewCreate, ReviewUpdate
 from app.security import get_current_user
@@ -15,38 +15,38 @@ review_router = APIRouter(prefix="/reviews", tags=["reviews"])
 
 
 @review_router.post("/", response_model=ReviewOut, status_code=status.HTTP_201_CREATED)
-def create_review(
+async def create_review(
         review_data: ReviewCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     try:
-        logger.info(
-            f"Received review creation request from user {current_user.id} for booking {review_data.booking_id}")
+        logger.info("Received review creation request from user %s for booking %s",
+                    current_user.id, review_data.booking_id)
 
-        new_review = Review_Crud.create_review(db, review_data, current_user.id)
+        new_review = await Review_Crud.create_review(db, review_data, current_user.id)
         return new_review
 
     except ValueError as e:
-        logger.warning(f"Validation error creating review: {str(e)}")
+        logger.warning("Validation error creating review: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Unexpected error creating review: {str(e)}")
+        logger.error("Unexpected error creating review: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
 @review_router.get("/service/{id}/review")
-def get_service_review(
+async def get_service_review(
         service_id: UUID,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     try:
-        service_review = Review_Crud.get_service_review(db, service_id)
+        service_review = await Review_Crud.get_service_review(db, service_id)
         if not service_review:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -58,16 +58,16 @@ def get_service_review(
         raise
 
 @review_router.patch("/{review_id}", response_model=ReviewOut)
-def update_review(
+async def update_review(
         review_id: UUID,
         update_data: ReviewUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     try:
-        logger.info(f"Received update request for review {review_id} from user {current_user.id}")
+        logger.info("Received update request for review %s from user %s", review_id, current_user.id)
 
-        updated_review = Review_Crud.update_review(db, review_id, update_data, current_user)
+        updated_review = await Review_Crud.update_review(db, review_id, update_data, current_user)
         if not updated_review:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -77,13 +77,13 @@ def update_review(
         return updated_review
 
     except PermissionError as e:
-        logger.warning(f"Permission error updating review {review_id}: {str(e)}")
+        logger.warning("Permission error updating review %s: %s", review_id, e)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Error updating review {review_id}: {str(e)}")
+        logger.error("Error updating review %s: %s", review_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -91,15 +91,15 @@ def update_review(
 
 
 @review_router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_review(
+async def delete_review(
         review_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     try:
-        logger.info(f"Received delete request for review {review_id} from user {current_user.id}")
+        logger.info("Received delete request for review %s from user %s", review_id, current_user.id)
 
-        success = Review_Crud.delete_review(db, review_id, current_user)
+        success = await Review_Crud.delete_review(db, review_id, current_user)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -109,13 +109,13 @@ def delete_review(
         return None
 
     except PermissionError as e:
-        logger.warning(f"Permission error deleting review {review_id}: {str(e)}")
+        logger.warning("Permission error deleting review %s: %s", review_id, e)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Error deleting review {review_id}: {str(e)}")
+        logger.error("Error deleting review %s: %s", review_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional, List
+import csv
+import io
+import json
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional, List
 from uuid import UUID
+from datetime import datetime
+from pydantic import ValidationError
 from app import logger
+from app.CRUD.rating import Rating_Crud
+from app.CRUD.review import Review_Crud
 from app.CRUD.service import Service_Crud
-from app.database import get_db
+from app.database import get_async_db, get_read_db
 from app.logger import get_logger
 from app.models import User
-from app.schemas.service import ServiceOut, ServiceCreate, ServiceUpdate
+from app.responses import get_adapter, json_response
+from app.schemas.review import ReviewOut, ReviewPage
+from app.schemas.service import (ServiceOut, ServiceCreate, ServiceUpdate, ServiceAvailability, ServiceRating,
+                                 ServiceImportResult)
 from app.schemas.user import Role
 from app.security import get_current_user
 
@@ -15,43 +27,118 @@ service_router = APIRouter(prefix="/services", tags=["services"])
 
 logger = get_logger(__name__)
 
+SERVICE_IMPORT_MAX_ROWS = int(os.getenv("SERVICE_IMPORT_MAX_ROWS", 100000))
 
-@service_router.get("/",)
-def get_services(
-        db: Session = Depends(get_db),
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@service_router.get("/", response_model=List[ServiceOut])
+async def get_services(
         price_min: Optional[float] = Query(None, ge=0, description="Minimum price"),
         price_max: Optional[float] = Query(None, ge=0, description="Maximum price"),
         active: Optional[bool] = Query(True, description="Filter by active status"),
         skip: int = Query(0, ge=0, description="Number of records to skip"),
-        limit: int = Query(100, ge=1, le=1000, description="Number of records to return")
+        limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+        if_none_match: Optional[str] = Header(None)
 ):
     try:
-        services, total = Service_Crud.get_services(
-            db, price_min, price_max, active, skip, limit
-        )
+        # Served from the catalog cache when warm, so a matching ETag never touches the database
+        page = await Service_Crud.get_catalog_page(price_min, price_max, active, skip, limit, cursor)
 
-        service_models = [ServiceOut.model_validate(service) for service in services]
+        headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+        if page.next_cursor:
+            headers["X-Next-Cursor"] = page.next_cursor
 
-        has_more = (skip + limit) < total
+        if etag_matches(if_none_match, page.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-        return service_models
+        return Response(content=page.body, media_type="application/json", headers=headers)
 
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(f"Error fetching services: {str(e)}")
+        logger.error("Error fetching services: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error fetching services"
         )
 
 
+@service_router.get("/{service_id}/availability", response_model=ServiceAvailability)
+async def get_service_availability(
+        service_id: UUID,
+        from_time: datetime = Query(..., alias="from", description="Start of the window"),
+        to_time: datetime = Query(..., alias="to", description="End of the window"),
+        granularity: Optional[int] = Query(None, ge=5, le=1440, description="Minutes between slot starts, defaults to the service duration"),
+        db: AsyncSession = Depends(get_read_db)
+):
+    try:
+        return await Service_Crud.get_availability(db, service_id, from_time, to_time, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@service_router.get("/{service_id}/rating", response_model=ServiceRating)
+async def get_service_rating(service_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    stats = await Rating_Crud.get_rating(db, service_id)
+    if not stats:
+        # No reviews yet; still 404/410 for unknown or inactive services
+        await Service_Crud.get_service(db, service_id)
+        return ServiceRating(service_id=service_id, histogram={str(rating): 0 for rating in range(1, 6)})
+
+    return ServiceRating(
+        service_id=service_id,
+        review_count=stats.review_count,
+        average_rating=stats.average_rating,
+        histogram=stats.histogram
+    )
+
+
+async def reviews_ndjson(query):
+    adapter = get_adapter(ReviewOut)
+    async for reviews in Review_Crud.stream_reviews(query):
+        yield b"".join(adapter.dump_json(adapter.validate_python(review, from_attributes=True)) + b"\n"
+                       for review in reviews)
+
+
+@service_router.get("/{service_id}/reviews", response_model=ReviewPage)
+async def get_service_reviews(
+        service_id: UUID,
+        sort: Literal["newest", "rating"] = Query("newest", description="newest first, or highest rating first"),
+        limit: int = Query(50, ge=1, le=200, description="Page size, ignored when streaming"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+        response_format: Literal["json", "ndjson"] = Query("json", alias="format",
+                                                           description="ndjson streams every review after the cursor"),
+        db: AsyncSession = Depends(get_read_db)
+):
+    await Service_Crud.get_service(db, service_id)
+
+    try:
+        if response_format == "ndjson":
+            query = Review_Crud.service_reviews_query(service_id, sort, cursor)
+            return StreamingResponse(reviews_ndjson(query), media_type="application/x-ndjson")
+
+        reviews, next_cursor = await Review_Crud.get_service_reviews(db, service_id, sort, limit, cursor)
+        return json_response(ReviewPage, {"data": reviews, "next_cursor": next_cursor})
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @service_router.get("/{id}", response_model=ServiceOut)
-def get_service(service_id: UUID,db: Session = Depends(get_db)):
-    return Service_Crud.get_service(db, service_id)
+async def get_service(service_id: UUID,db: AsyncSession = Depends(get_read_db)):
+    return await Service_Crud.get_service(db, service_id)
 
 @service_router.post("/", response_model=ServiceOut, status_code=status.HTTP_201_CREATED)
-def create_service(
+async def create_service(
         service_data: ServiceCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     if current_user.role != Role.ADMIN:
@@ -61,28 +148,86 @@ def create_service(
         )
 
     try:
-        new_service = Service_Crud.create_service(db, service_data)
+        new_service = await Service_Crud.create_service(db, service_data)
         logger.info("Service created successfully")
 
-        db.commit()
+        await db.commit()
+        Service_Crud.invalidate_catalog()
         return new_service
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"Unable to create service..")
+        await db.rollback()
+        logger.error("Unable to create service..")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error during service creation: {str(e)}"
         )
 
 
+def parse_import_rows(body: bytes, content_type: str) -> list:
+    if "csv" in content_type:
+        return list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of services")
+    return rows
+
+
+@service_router.post("/bulk", response_model=ServiceImportResult)
+async def bulk_create_services(
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_user)
+):
+    if current_user.role != Role.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can create services"
+        )
+
+    try:
+        rows = parse_import_rows(await request.body(), request.headers.get("content-type", ""))
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Could not parse import: {str(e)}")
+
+    if len(rows) > SERVICE_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {SERVICE_IMPORT_MAX_ROWS} services per import"
+        )
+
+    services, errors = [], []
+    for index, row in enumerate(rows, start=1):
+        try:
+            services.append(ServiceCreate.model_validate(row))
+        except ValidationError as e:
+            errors.append({
+                "row": index,
+                "errors": [{"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+                           for error in e.errors()]
+            })
+
+    try:
+        imported = await Service_Crud.bulk_create_services(db, services) if services else 0
+    except Exception as e:
+        await db.rollback()
+        logger.error("Bulk service import failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error during bulk service import: {str(e)}"
+        )
+
+    logger.info("Bulk import: %s services imported, %s rows rejected", imported, len(errors))
+    return {"received": len(rows), "imported": imported, "errors": errors}
+
+
 @service_router.patch("/{id}", response_model=ServiceOut)
-def update_service(
+async def update_service(
         service_id: UUID,
         service_data: ServiceUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     if current_user.role != Role.ADMIN:
@@ -92,21 +237,22 @@ def update_service(
         )
 
     try:
-        service = Service_Crud.update_service(db, service_id, service_data)
+        service = await Service_Crud.update_service(db, service_id, service_data)
         if not service:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Service not found"
             )
-        db.commit()
+        await db.commit()
+        Service_Crud.invalidate_catalog()
         return service
 
     except HTTPException:
         raise
 
     except Exception as e:
-        db.rollback()
-        logger.error(f"Unable to update service: {str(e)}")
+        await db.rollback()
+        logger.error("Unable to update service: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error during service updating: {str(e)}"
@@ -114,9 +260,9 @@ def update_service(
 
 
 @service_router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_service(
+async def delete_service(
         service_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     if current_user.role != Role.ADMIN:
@@ -126,7 +272,7 @@ def delete_service(
         )
 
     try:
-        del_service = Service_Crud.delete_service(db, service_id)
+        del_service = await Service_Crud.delete_service(db, service_id)
         if not del_service:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -139,8 +285,8 @@ def delete_service(
         raise
 
     except Exception as e:
-        db.rollback()
-        logger.error(f"Unable to delete service: {str(e)}")
+        await db.rollback()
+        logger.error("Unable to delete service: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error during service deletion: {str(e)}"
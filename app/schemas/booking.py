@@ -1,7 +1,7 @@
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, ConfigDict
 from enum import Enum
 
 
@@ -38,6 +38,30 @@ class BookingOut(BookingBase):
     model_config = ConfigDict(from_attributes=True)  # v2 syntax
 
 
+class BookingPage(BaseModel):
+    data: List[BookingOut]
+    total: Optional[int] = None
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+class BookingBatchStatus(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+    status: BookingStatus
+
+
+class BookingSkipped(BaseModel):
+    id: UUID
+    reason: str
+
+
+class BookingBatchStatusResult(BaseModel):
+    status: BookingStatus
+    updated: List[UUID]
+    skipped: List[BookingSkipped]
+
+
 class BookingFilter(BaseModel):
     status: Optional[BookingStatus] = None
     from_date: Optional[datetime] = None
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 
 
 class ReviewBase(BaseModel):
@@ -30,4 +30,8 @@ class ReviewOut(ReviewBase):
     booking_id: UUID
     created_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ReviewPage(BaseModel):
+    data: List[ReviewOut]
+    next_cursor: Optional[str] = None
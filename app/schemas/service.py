@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, List
 from uuid import UUID
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -10,7 +10,9 @@ class ServiceBase(BaseModel):
     duration_minutes: int
 
 class ServiceCreate(ServiceBase):
-    pass
+    title: str = Field(..., min_length=1, max_length=50)
+    price: int = Field(..., gt=0, lt=100_000_000)
+    duration_minutes: int = Field(..., gt=0)
 
 
 class Service(ServiceBase):
@@ -26,6 +28,8 @@ class ServiceOut(BaseModel):
     duration_minutes: int
     is_active: bool = True
     created_at: datetime
+    review_count: int = 0
+    average_rating: Optional[float] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -37,4 +41,36 @@ class ServiceUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AvailabilitySlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+
+class ServiceAvailability(BaseModel):
+    service_id: UUID
+    from_time: datetime = Field(..., serialization_alias="from")
+    to_time: datetime = Field(..., serialization_alias="to")
+    duration_minutes: int
+    granularity_minutes: int
+    slots: List[AvailabilitySlot]
+
+
+class ServiceRating(BaseModel):
+    service_id: UUID
+    review_count: int = 0
+    average_rating: Optional[float] = None
+    histogram: Dict[str, int]
+
+
+class ServiceImportError(BaseModel):
+    row: int
+    errors: List[Dict[str, str]]
+
+
+class ServiceImportResult(BaseModel):
+    received: int
+    imported: int
+    errors: List[ServiceImportError]
@@ -45,6 +45,15 @@ class Token(BaseModel):
     token_type: str = "bearer"
     refresh_token: str
 
+class Principal(BaseModel):
+    id: UUID
+    name: str
+    email: EmailStr
+    role: Optional[Role] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
 class TokenData(BaseModel):
     email: str | None = None
 
@@ -1,17 +1,19 @@
 import os
 from datetime import timedelta, datetime, timezone
 from typing import Optional, List
+from uuid import UUID, uuid4
 import jwt
 from fastapi import HTTPException, Depends, status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
-from dotenv import load_dotenv
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models
-from app.database import get_db
+from app.database import get_async_db
+from app.cache import TTLCache
+from app.hashing import password_hasher
 from app.models import BlacklistedToken
-
-load_dotenv()
+from app.revocation import revoked_tokens, revocation_key
+from app.schemas.user import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -19,14 +21,11 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+TOKEN_SUB_USER_ID = os.getenv("TOKEN_SUB_USER_ID", "false").lower() == "true"
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
 
 def create_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -34,7 +33,7 @@ def create_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -49,19 +48,41 @@ def create_access_token(sub: str, roles: List[str] = None) -> str:
 def create_refresh_token(data: dict)-> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
-    user = db.query(models.User).filter(models.User.email == email.lower()).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[models.User]:
+    user = await db.scalar(select(models.User).where(models.User.email == email.lower()))
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+
+    # Give the connection back to the pool while bcrypt runs
+    await db.close()
+    verified, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not verified:
         return None
+
+    if new_hash:
+        await db.execute(update(models.User).where(models.User.id == user.id).values(password_hash=new_hash))
+        await db.commit()
     return user
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> models.User:
+def token_subject(user: models.User) -> str:
+    return str(user.id) if TOKEN_SUB_USER_ID else user.email
+
+async def get_user_by_subject(db: AsyncSession, sub: str) -> Optional[models.User]:
+    # Tokens carry either the user id (primary key lookup) or the email
+    try:
+        user_id = UUID(sub)
+    except ValueError:
+        return await db.scalar(select(models.User).where(models.User.email == sub))
+    return await db.get(models.User, user_id)
+
+def invalidate_principal(user_id: UUID) -> None:
+    principal_cache.remove_where(lambda sub, principal: principal.id == user_id)
+
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -72,21 +93,31 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if payload.get("type") != "access":
             raise credentials_exception
-        email: str = payload.get("sub")
-        if email is None:
+        sub: str = payload.get("sub")
+        if sub is None:
             raise credentials_exception
-    except PyJWTError:
+    except jwt.PyJWTError:
+        raise credentials_exception
+
+    if revoked_tokens.is_revoked(revocation_key(token, payload)):
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.email == email).first()
+    principal = principal_cache.get(sub)
+    if principal is not None:
+        return principal
+
+    user = await get_user_by_subject(db, sub)
     if user is None:
         raise credentials_exception
-    return user
 
-def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.email == email.lower()).first()
+    principal = Principal.model_validate(user)
+    principal_cache.set(sub, principal)
+    return principal
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    return await db.scalar(select(models.User).where(models.User.email == email.lower()))
 
-def is_token_blacklisted(db: Session, token: str) -> bool:
-    blacklisted = db.query(BlacklistedToken).filter(BlacklistedToken.token == token).first()
+async def is_token_blacklisted(db: AsyncSession, token: str) -> bool:
+    blacklisted = await db.scalar(select(BlacklistedToken).where(BlacklistedToken.token == token))
     return blacklisted is not None
 
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.CRUD.auth import Auth_Service
+from app.CRUD.booking import Booking_Crud
+
+logger = logging.getLogger(__name__)
+
+BOOKING_AUTOCOMPLETE_ENABLED = os.getenv("BOOKING_AUTOCOMPLETE_ENABLED", "true").lower() == "true"
+BOOKING_AUTOCOMPLETE_INTERVAL_SECONDS = int(os.getenv("BOOKING_AUTOCOMPLETE_INTERVAL_SECONDS", 60))
+BOOKING_AUTOCOMPLETE_BATCH_SIZE = int(os.getenv("BOOKING_AUTOCOMPLETE_BATCH_SIZE", 500))
+
+TOKEN_SWEEP_ENABLED = os.getenv("TOKEN_SWEEP_ENABLED", "true").lower() == "true"
+TOKEN_SWEEP_INTERVAL_SECONDS = int(os.getenv("TOKEN_SWEEP_INTERVAL_SECONDS", 3600))
+TOKEN_SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", 1000))
+
+
+class PeriodicTask:
+    """Runs a database job every `interval` seconds and keeps counters for /admin/workers."""
+
+    def __init__(self, name: str, job: Callable[[AsyncSession], Awaitable[int]], interval: int, enabled: bool = True):
+        self.name = name
+        self.job = job
+        self.interval = interval
+        self.enabled = enabled
+        self.runs = 0
+        self.errors = 0
+        self.processed_total = 0
+        self.last_processed = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    async def run_once(self, session_factory) -> int:
+        try:
+            async with session_factory() as db:
+                processed = await self.job(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            logger.error("%s failed: %s", self.name, e)
+            return 0
+        finally:
+            self.runs += 1
+            self.last_run_at = datetime.now(timezone.utc)
+
+        self.last_processed = processed
+        self.processed_total += processed
+        if processed:
+            logger.info("%s processed %s rows", self.name, processed)
+        return processed
+
+    async def run(self, session_factory) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once(session_factory)
+
+    def start(self, session_factory) -> Optional[asyncio.Task]:
+        if not self.enabled:
+            logger.info("%s is disabled", self.name)
+            return None
+        return asyncio.create_task(self.run(session_factory))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "errors": self.errors,
+            "processed_total": self.processed_total,
+            "last_processed": self.last_processed,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+
+async def complete_past_bookings(db: AsyncSession) -> int:
+    # One short transaction per batch; keep going until the backlog is drained
+    completed = 0
+    while True:
+        batch = await Booking_Crud.complete_past_bookings(db, BOOKING_AUTOCOMPLETE_BATCH_SIZE)
+        completed += batch
+        if batch < BOOKING_AUTOCOMPLETE_BATCH_SIZE:
+            return completed
+
+
+async def sweep_expired_tokens(db: AsyncSession) -> int:
+    deleted = 0
+    while True:
+        batch = await Auth_Service.purge_expired_tokens(db, TOKEN_SWEEP_BATCH_SIZE)
+        deleted += batch
+        if batch < TOKEN_SWEEP_BATCH_SIZE:
+            return deleted
+
+
+booking_completion = PeriodicTask(
+    "booking_completion", complete_past_bookings,
+    BOOKING_AUTOCOMPLETE_INTERVAL_SECONDS, BOOKING_AUTOCOMPLETE_ENABLED
+)
+
+token_sweeper = PeriodicTask(
+    "token_sweeper", sweep_expired_tokens,
+    TOKEN_SWEEP_INTERVAL_SECONDS, TOKEN_SWEEP_ENABLED
+)
+
+periodic_tasks = [booking_completion, token_sweeper]
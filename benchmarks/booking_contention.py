@@ -0,0 +1,184 @@
+"""Booking contention stress test.
+
+Fires concurrent POST /bookings/ requests at a handful of contested slots and checks
+that the write path never double-books. Every request for a slot asks for a
+one-hour booking starting 0, 15 or 30 minutes into it, so all requests for the same
+slot overlap each other and at most one of them may win.
+
+Each concurrency level gets its own fresh slots further in the future and reports
+throughput, the 201/409 split and tail latency, so changes to create_booking can be
+compared run against run. Exits 1 if any slot ends up with more than one active
+booking, or if the 201 count disagrees with what the database holds.
+
+    python -m benchmarks.booking_contention --concurrency 1 10 50 100 --requests 500
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import delete, func, select, text
+
+from app import models
+from app.database import AsyncSessionLocal, async_engine
+from app.main import app
+from app.schemas.booking import BookingStatus
+from app.schemas.user import Role
+from app.security import create_access_token, token_subject
+from benchmarks.endpoints import percentile
+from benchmarks.seed import BENCH_EMAIL_DOMAIN
+
+SLOT_OFFSETS_MINUTES = (0, 15, 30)
+BOOKING_LENGTH = timedelta(hours=1)
+# Slots are two hours apart so neighbouring slots never overlap
+SLOT_SPACING = timedelta(hours=2)
+
+
+async def create_fixtures(services: int, users: int):
+    run = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        service_rows = [
+            models.Service(title=f"contention {run} {i}", description="contention test",
+                           price=100, duration_minutes=60, is_active=True)
+            for i in range(services)
+        ]
+        user_rows = [
+            models.User(name=f"contender{i}", email=f"contender{i}.{run}@{BENCH_EMAIL_DOMAIN}",
+                        role=Role.USER, password_hash="x")
+            for i in range(users)
+        ]
+        db.add_all(service_rows + user_rows)
+        await db.commit()
+        tokens = [create_access_token(sub=token_subject(user), roles=[user.role]) for user in user_rows]
+        return [service.id for service in service_rows], [user.id for user in user_rows], tokens
+
+
+async def drop_fixtures(service_ids, user_ids):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(models.Booking).where(models.Booking.service_id.in_(service_ids)))
+        await db.execute(delete(models.Service).where(models.Service.id.in_(service_ids)))
+        await db.execute(delete(models.User).where(models.User.id.in_(user_ids)))
+        await db.commit()
+
+
+async def count_winners(service_ids, slots) -> tuple:
+    """Active bookings per contested slot, straight from the database."""
+    overlap = text("tstzrange(bookings.start_time, bookings.end_time) && tstzrange(:slot_start, :slot_end)")
+    winners = {}
+    async with AsyncSessionLocal() as db:
+        for service_id in service_ids:
+            for slot_start in slots:
+                winners[(service_id, slot_start)] = await db.scalar(
+                    select(func.count()).select_from(models.Booking)
+                    .where(models.Booking.service_id == service_id)
+                    .where(models.Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]))
+                    .where(overlap.bindparams(slot_start=slot_start, slot_end=slot_start + SLOT_SPACING))
+                )
+    return winners
+
+
+async def run_level(client, service_ids, tokens, slots, requests, concurrency, rng) -> dict:
+    targets = [(rng.choice(service_ids), rng.choice(slots)) for _ in range(requests)]
+    remaining = iter(targets)
+    latencies, statuses = [], Counter()
+
+    async def worker():
+        for service_id, slot_start in remaining:
+            start_time = slot_start + timedelta(minutes=rng.choice(SLOT_OFFSETS_MINUTES))
+            payload = {
+                "service_id": str(service_id),
+                "start_time": start_time.isoformat(),
+                "end_time": (start_time + BOOKING_LENGTH).isoformat(),
+            }
+            headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+            started = time.perf_counter()
+            response = await client.post("/bookings/", json=payload, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    winners = await count_winners(service_ids, slots)
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "rps": requests / wall,
+        "created": statuses[201],
+        "conflicts": statuses[409],
+        "other": sum(count for status_code, count in statuses.items() if status_code not in (201, 409)),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "double_booked": sum(1 for count in winners.values() if count > 1),
+        "active": sum(winners.values()),
+    }
+
+
+async def run(args) -> list:
+    rng = random.Random(args.random_seed)
+    service_ids, user_ids, tokens = await create_fixtures(args.services, args.users)
+    # Start on the hour well past anything the endpoint benchmark seeds
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=365)
+
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'conc':>5} {'req/s':>8} {'201':>5} {'409':>6} {'other':>5} {'409 %':>6} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'double':>6}")
+            for level, concurrency in enumerate(args.concurrency):
+                level_start = base + level * args.slots * SLOT_SPACING
+                slots = [level_start + i * SLOT_SPACING for i in range(args.slots)]
+                result = await run_level(client, service_ids, tokens, slots, args.requests, concurrency, rng)
+                results.append(result)
+                print(f"{concurrency:>5} {result['rps']:>8.0f} {result['created']:>5} {result['conflicts']:>6} "
+                      f"{result['other']:>5} {result['conflicts'] / args.requests:>6.1%} "
+                      f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                      f"{result['double_booked']:>6}")
+    finally:
+        if not args.keep:
+            await drop_fixtures(service_ids, user_ids)
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100],
+                        help="requests in flight, one run per level")
+    parser.add_argument("--requests", type=int, default=500, help="booking attempts per level")
+    parser.add_argument("--services", type=int, default=3, help="services being raced for")
+    parser.add_argument("--slots", type=int, default=5, help="contested slots per service and level")
+    parser.add_argument("--users", type=int, default=50, help="distinct users making the attempts")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="leave the test services and bookings in place")
+    args = parser.parse_args()
+
+    # Every 409 is logged by the app otherwise
+    logging.getLogger("app").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+
+    failures = []
+    for result in results:
+        if result["double_booked"]:
+            failures.append(f"concurrency {result['concurrency']}: {result['double_booked']} slots double-booked")
+        if result["created"] != result["active"]:
+            failures.append(f"concurrency {result['concurrency']}: {result['created']} bookings created "
+                            f"but {result['active']} active in the database")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
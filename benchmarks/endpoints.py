@@ -0,0 +1,169 @@
+"""Endpoint latency benchmark.
+
+Drives the FastAPI app in-process through httpx's ASGI transport, so the numbers
+cover routing, dependencies, CRUD, serialization and the database, but no network.
+Each scenario hits one read endpoint of a router in app/router/ with a fixed
+concurrency and reports p50/p95/p99 latency and throughput.
+
+Results can be saved as a JSON baseline and later runs compared against it; the
+script exits non-zero when any scenario's p95 grows, or its throughput drops, by
+more than --threshold.
+
+    python -m benchmarks.endpoints --seed --save-baseline bench-baseline.json
+    python -m benchmarks.endpoints --baseline bench-baseline.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.database import AsyncSessionLocal, async_engine
+from app.main import app
+from app.security import create_access_token, token_subject
+from benchmarks.seed import load_fixtures, seed
+
+
+def scenarios(fixtures: dict) -> list:
+    service_id = fixtures["service"].id
+    booking_id = fixtures["booking"].id
+    now = datetime.now(timezone.utc)
+    window = {"from": now.isoformat(), "to": (now + timedelta(days=7)).isoformat()}
+
+    # (name, role, path, query params)
+    return [
+        ("services.list", "user", "/services/", {}),
+        ("services.list_price", "user", "/services/", {"price_min": 50, "price_max": 200}),
+        ("services.get", "user", f"/services/{service_id}", {"service_id": str(service_id)}),
+        ("services.availability", "user", f"/services/{service_id}/availability", window),
+        ("services.rating", "user", f"/services/{service_id}/rating", {}),
+        ("services.reviews", "user", f"/services/{service_id}/reviews", {}),
+        ("services.reviews_rating", "user", f"/services/{service_id}/reviews", {"sort": "rating"}),
+        ("bookings.list_user", "user", "/bookings/", {}),
+        ("bookings.list_admin", "admin", "/bookings/", {}),
+        ("bookings.list_admin_status", "admin", "/bookings/", {"status": "confirmed"}),
+        ("bookings.get", "user", f"/bookings/{booking_id}", {}),
+        ("reviews.service", "user", f"/reviews/service/{service_id}/review", {"service_id": str(service_id)}),
+        ("users.me", "user", "/me/", {}),
+        ("admin.pool", "admin", "/admin/pool", {}),
+    ]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+async def run_scenario(client, headers, path, params, requests, concurrency, warmup) -> dict:
+    for _ in range(warmup):
+        await client.get(path, params=params, headers=headers)
+
+    latencies, statuses = [], Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, params=params, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": sum(count for status_code, count in statuses.items() if status_code >= 400),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "rps": requests / wall,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {previous['rps']:.0f} -> {current['rps']:.0f} req/s")
+    return regressions
+
+
+async def run(args) -> dict:
+    if args.seed:
+        await seed(args.users, args.services, args.bookings_per_service)
+
+    async with AsyncSessionLocal() as db:
+        fixtures = await load_fixtures(db)
+    tokens = {
+        role: create_access_token(sub=token_subject(fixtures[role]), roles=[fixtures[role].role])
+        for role in ("user", "admin")
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'scenario':<28} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+        for name, role, path, params in scenarios(fixtures):
+            if args.only and not any(part in name for part in args.only):
+                continue
+            headers = {"Authorization": f"Bearer {tokens[role]}"}
+            result = await run_scenario(client, headers, path, params, args.requests, args.concurrency, args.warmup)
+            results[name] = result
+            print(f"{name:<28} {result['errors']:>6} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                  f"{result['p99_ms']:>8.2f} {result['rps']:>8.0f}")
+
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert synthetic rows before benchmarking")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--bookings-per-service", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--only", nargs="+", help="run only scenarios whose name contains one of these")
+    parser.add_argument("--baseline", help="JSON baseline to compare against")
+    parser.add_argument("--save-baseline", help="write this run's results as a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    # Per-request INFO logging would dominate the measurements
+    logging.getLogger("app").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        print(f"{len(regressions)} regressions beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""EXPLAIN regression check for the CRUD read paths.
+
+Drives the query methods in app/CRUD against a seeded database, records every
+SELECT they emit and re-plans it with sequential scans disabled. Any plan that
+still contains a Seq Scan on one of our tables has no usable index, so the
+script prints the offending query and exits non-zero.
+
+    python -m benchmarks.explain_plans --seed
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, select
+
+from app import models
+from app.CRUD.booking import Booking_Crud
+from app.CRUD.review import Review_Crud
+from app.CRUD.service import Service_Crud
+from app.CRUD.user import User_Crud
+from app.database import AsyncSessionLocal, async_engine
+from app.schemas.booking import BookingStatus
+from app.schemas.user import Role
+from app.security import get_user_by_email
+from benchmarks.seed import seed
+
+CHECKED_TABLES = {"users", "services", "bookings", "reviews", "blacklisted_tokens", "service_rating_stats"}
+
+
+async def run_read_paths(db):
+    admin = await db.scalar(select(models.User).where(models.User.role == Role.ADMIN))
+    user = await db.scalar(select(models.User).where(models.User.role == Role.USER))
+    service = await db.scalar(select(models.Service).where(models.Service.is_active.is_(True)))
+    booking = await db.scalar(select(models.Booking))
+    review = await db.scalar(select(models.Review))
+    if not all([admin, user, service, booking, review]):
+        raise SystemExit("Database is empty, run with --seed first")
+
+    now = datetime.now(timezone.utc)
+
+    async def bookings_cursor_page():
+        _, _, cursor = await Booking_Crud.get_bookings(db, user, limit=1)
+        return await Booking_Crud.get_bookings(db, user, cursor=cursor)
+
+    async def services_cursor_page():
+        _, _, cursor = await Service_Crud.get_services(db, limit=1)
+        return await Service_Crud.get_services(db, cursor=cursor)
+
+    async def reviews_cursor_page(sort):
+        _, cursor = await Review_Crud.get_service_reviews(db, review.service_id, sort, limit=1)
+        return await Review_Crud.get_service_reviews(db, review.service_id, sort, cursor=cursor)
+
+    paths = {
+        "Booking_Crud.get_bookings(admin)": lambda: Booking_Crud.get_bookings(db, admin),
+        "Booking_Crud.get_bookings(admin, status)": lambda: Booking_Crud.get_bookings(
+            db, admin, BookingStatus.CONFIRMED),
+        "Booking_Crud.get_bookings(user, range)": lambda: Booking_Crud.get_bookings(
+            db, user, None, now - timedelta(days=7), now + timedelta(days=7)),
+        "Booking_Crud.get_bookings(user, cursor)": bookings_cursor_page,
+        "Booking_Crud.get_booking": lambda: Booking_Crud.get_booking(db, booking.id, admin),
+        "Service_Crud.get_services": lambda: Service_Crud.get_services(db),
+        "Service_Crud.get_services(price)": lambda: Service_Crud.get_services(db, 50, 200),
+        "Service_Crud.get_services(cursor)": services_cursor_page,
+        "Service_Crud.get_service": lambda: Service_Crud.get_service(db, service.id),
+        "Service_Crud.get_availability": lambda: Service_Crud.get_availability(
+            db, service.id, now, now + timedelta(days=7)),
+        "Review_Crud.get_service_review": lambda: Review_Crud.get_service_review(db, review.service_id),
+        "Review_Crud.get_service_reviews(newest)": lambda: reviews_cursor_page("newest"),
+        "Review_Crud.get_service_reviews(rating)": lambda: reviews_cursor_page("rating"),
+        "Review_Crud.get_review": lambda: Review_Crud.get_review(db, review.id),
+        "User_Crud.get_user_by_id": lambda: User_Crud.get_user_by_id(db, user.id),
+        "User_Crud.get_user_by_email": lambda: User_Crud.get_user_by_email(db, user.email),
+        "security.get_user_by_email": lambda: get_user_by_email(db, user.email),
+    }
+
+    captured = []
+    for name, call in paths.items():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            await call()
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        captured.extend((name, statement, parameters) for statement, parameters in statements)
+
+    return captured
+
+
+def seq_scans(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def check(args):
+    if args.seed:
+        await seed()
+
+    async with AsyncSessionLocal() as db:
+        captured = await run_read_paths(db)
+
+    failures = 0
+    async with async_engine.connect() as conn:
+        # With seq scans priced out, one only survives if no index can serve the query
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        for name, statement, parameters in captured:
+            result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            tables = seq_scans(plan[0]["Plan"])
+            if tables:
+                failures += 1
+                print(f"FAIL {name}: sequential scan on {', '.join(sorted(set(tables)))}")
+                print(f"     {' '.join(statement.split())}")
+            else:
+                print(f"ok   {name}")
+            if args.verbose:
+                print(json.dumps(plan, indent=2))
+    await async_engine.dispose()
+
+    print(f"{len(captured)} statements checked, {failures} with sequential scans")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert synthetic rows before checking")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    failures = asyncio.run(check(args))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
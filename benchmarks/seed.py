@@ -0,0 +1,112 @@
+"""Synthetic data seeder for the benchmarks.
+
+Generates users, services, bookings and reviews and loads them with COPY over the
+app's own async engine, then rebuilds the rating aggregates and runs ANALYZE.
+Booking slots never overlap within a service, so the exclusion constraint holds.
+
+    python -m benchmarks.seed --users 5000 --services 1000 --bookings-per-service 200
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app import models
+from app.CRUD.rating import Rating_Crud
+from app.database import AsyncSessionLocal, async_engine
+from app.schemas.booking import BookingStatus
+from app.schemas.user import Role
+
+BENCH_EMAIL_DOMAIN = "bench.example.com"
+
+
+def generate(users=500, services=200, bookings_per_service=100, seed=0):
+    rng = random.Random(seed)
+    # Keeps emails unique when seeding the same database more than once
+    run = uuid.uuid4().hex[:8]
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    user_rows = [
+        (uuid.uuid4(), f"user{i}", f"user{i}.{run}@{BENCH_EMAIL_DOMAIN}", Role.ADMIN.name if i == 0 else Role.USER.name, "x")
+        for i in range(users)
+    ]
+    service_rows = [
+        (uuid.uuid4(), f"service {i}", "seeded", rng.randint(10, 500), 60, i % 10 != 0)
+        for i in range(services)
+    ]
+
+    booking_rows, review_rows = [], []
+    statuses = list(BookingStatus)
+    for service_id, *_ in service_rows:
+        for slot in range(bookings_per_service):
+            start = now + timedelta(hours=slot - bookings_per_service // 2)
+            booking_status = rng.choice(statuses)
+            booking_id, user_id = uuid.uuid4(), rng.choice(user_rows)[0]
+            booking_rows.append((booking_id, user_id, service_id, start, start + timedelta(hours=1), booking_status.name))
+            if booking_status == BookingStatus.COMPLETED:
+                review_rows.append((uuid.uuid4(), booking_id, user_id, service_id, rng.randint(1, 5), "seeded"))
+
+    return {
+        "users": (("id", "name", "email", "role", "password_hash"), user_rows),
+        "services": (("id", "title", "description", "price", "duration_minutes", "is_active"), service_rows),
+        "bookings": (("id", "user_id", "service_id", "start_time", "end_time", "status"), booking_rows),
+        "reviews": (("id", "booking_id", "user_id", "service_id", "rating", "comment"), review_rows),
+    }
+
+
+async def copy_rows(tables: dict):
+    async with async_engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        async with raw.driver_connection.cursor() as cursor:
+            for table, (columns, rows) in tables.items():
+                async with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+        await conn.commit()
+
+
+async def seed(users=500, services=200, bookings_per_service=100, seed=0) -> dict:
+    tables = generate(users, services, bookings_per_service, seed)
+    await copy_rows(tables)
+
+    async with AsyncSessionLocal() as db:
+        await Rating_Crud.rebuild(db)
+    async with async_engine.connect() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+        await conn.commit()
+
+    return {table: len(rows) for table, (_, rows) in tables.items()}
+
+
+async def load_fixtures(db) -> dict:
+    """Pick representative rows out of a seeded database for the benchmark scenarios."""
+    admin = await db.scalar(select(models.User).where(models.User.role == Role.ADMIN))
+    user = await db.scalar(select(models.User).join(models.Booking).where(models.User.role == Role.USER))
+    service = await db.scalar(select(models.Service).join(models.Review).where(models.Service.is_active.is_(True)))
+    booking = await db.scalar(select(models.Booking).where(models.Booking.user_id == user.id)) if user else None
+    if not all([admin, user, service, booking]):
+        raise SystemExit("Database is empty, seed it first")
+    return {"admin": admin, "user": user, "service": service, "booking": booking}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--bookings-per-service", type=int, default=100)
+    parser.add_argument("--random-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async def run():
+        counts = await seed(args.users, args.services, args.bookings_per_service, args.random_seed)
+        await async_engine.dispose()
+        print(", ".join(f"{count} {table}" for table, count in counts.items()))
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
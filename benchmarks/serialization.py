@@ -0,0 +1,77 @@
+"""Per-row serialization cost of the list endpoints, before and after the fast path.
+
+Builds transient Booking rows and renders a GET /bookings/ page three ways:
+
+  before    model_validate per row, then jsonable_encoder + JSONResponse, which is
+            what response_model=dict did
+  orjson    the same models rendered by the ORJSONResponse default class
+  adapter   one cached TypeAdapter validate + dump_json pass (json_response)
+
+No database is needed.
+
+    python -m benchmarks.serialization --rows 100 1000
+"""
+import argparse
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app import models
+from app.responses import json_response
+from app.schemas.booking import BookingOut, BookingPage, BookingStatus
+
+
+def make_rows(count):
+    now = datetime.now(timezone.utc)
+    return [
+        models.Booking(id=uuid.uuid4(), user_id=uuid.uuid4(), service_id=uuid.uuid4(),
+                       start_time=now + timedelta(hours=i), end_time=now + timedelta(hours=i + 1),
+                       status=BookingStatus.CONFIRMED, created_at=now)
+        for i in range(count)
+    ]
+
+
+def page(data):
+    return {"data": data, "total": len(data), "skip": 0, "limit": len(data), "next_cursor": None}
+
+
+def before(rows):
+    models_ = [BookingOut.model_validate(row) for row in rows]
+    return JSONResponse(jsonable_encoder(page(models_))).body
+
+
+def orjson_only(rows):
+    models_ = [BookingOut.model_validate(row) for row in rows]
+    return ORJSONResponse(jsonable_encoder(page(models_))).body
+
+
+def adapter(rows):
+    return json_response(BookingPage, page(rows)).body
+
+
+PATHS = {"before": before, "orjson": orjson_only, "adapter": adapter}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000], help="page sizes to render")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per path, best is reported")
+    args = parser.parse_args()
+
+    print(f"{'rows':>6}  {'path':<8} {'page ms':>9} {'us/row':>8} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        number = max(1, 2000 // count)
+        baseline = None
+        for name, render in PATHS.items():
+            render(rows)
+            best = min(timeit.repeat(lambda: render(rows), number=number, repeat=args.repeat)) / number
+            baseline = baseline or best
+            print(f"{count:>6}  {name:<8} {best * 1000:>9.3f} {best / count * 1e6:>8.2f} {baseline / best:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Startup time benchmark.
+
+Measures the two halves of a cold start separately:
+
+- import: `import app.main` in a fresh interpreter, repeated --runs times. This is
+  what every worker pays before it can accept a connection and needs no database.
+- lifespan: the app's startup (pool warm-up, revoked-token load, workers) and
+  shutdown, run in-process against DATABASE_URL.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --importtime 15
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+
+def time_imports(runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import app.main"], check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def slowest_imports(top: int) -> list:
+    # -X importtime reports "self | cumulative | module" per import on stderr
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                            check=True, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+async def time_lifespan() -> tuple:
+    from app.main import app
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter() - start
+        start = time.perf_counter()
+    return started, time.perf_counter() - start
+
+
+def summary(timings: list) -> str:
+    ms = [t * 1000 for t in timings]
+    return f"median {statistics.median(ms):.0f} ms, min {min(ms):.0f} ms, max {max(ms):.0f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time the import in")
+    parser.add_argument("--importtime", type=int, metavar="N", help="also list the N slowest imports")
+    parser.add_argument("--skip-lifespan", action="store_true", help="only time the import, no database needed")
+    args = parser.parse_args()
+
+    print(f"import app.main: {summary(time_imports(args.runs))} over {args.runs} runs")
+
+    if args.importtime:
+        for cumulative, module in slowest_imports(args.importtime):
+            print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    if not args.skip_lifespan:
+        started, stopped = asyncio.run(time_lifespan())
+        print(f"lifespan: startup {started * 1000:.0f} ms, shutdown {stopped * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()